@@ -0,0 +1,95 @@
+"""Static assets shared by every page and session.
+
+Usage:
+    python assets.py    # size report for the bundled Lottie animations
+"""
+import json
+import os
+import threading
+
+import streamlit as st
+
+# --------------------------
+# Asset settings
+# --------------------------
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ANIMATIONS_DIR = os.path.join(ROOT, "animations")
+FLOAT_PRECISION = 3  # decimals kept in Lottie keyframes; invisible at any rendered size
+DROPPED_KEYS = {"meta", "mn"}  # exporter metadata and After Effects match names; unused by the player
+
+_lottie = {}  # absolute path -> (mtime_ns, minified dict)
+_lottie_lock = threading.Lock()
+
+
+def _resolve(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def minify_lottie(data):
+    """Round floats and drop metadata keys, recursively; returns a new object."""
+    if isinstance(data, dict):
+        return {k: minify_lottie(v) for k, v in data.items() if k not in DROPPED_KEYS}
+    if isinstance(data, list):
+        return [minify_lottie(v) for v in data]
+    if isinstance(data, float):
+        value = round(data, FLOAT_PRECISION)
+        return int(value) if value.is_integer() else value
+    return data
+
+
+def load_lottie(path: str) -> dict:
+    """Parsed, minified animation, read from disk once per process and again only if the file changes."""
+    path = _resolve(path)
+    mtime = os.stat(path).st_mtime_ns  # raises FileNotFoundError like open() would
+    entry = _lottie.get(path)
+    if entry is None or entry[0] != mtime:
+        with _lottie_lock:
+            entry = _lottie.get(path)
+            if entry is None or entry[0] != mtime:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = (mtime, minify_lottie(json.load(f)))
+                _lottie[path] = entry
+    return entry[1]
+
+
+def show_lottie(path: str, fallback="⚠️ Animation could not be loaded.", **kwargs):
+    """Render an animation with ``streamlit_lottie``, or an info note if it can't be loaded."""
+    try:
+        from streamlit_lottie import st_lottie
+
+        st_lottie(load_lottie(path), **kwargs)
+    except Exception:
+        st.info(fallback)
+
+
+# --------------------------
+# Size report
+# --------------------------
+def asset_report(directory=ANIMATIONS_DIR) -> list:
+    """Per-animation sizes on disk and as sent to the browser (minified, compact JSON)."""
+    report = []
+    if not os.path.isdir(directory):
+        return report
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            sent = len(json.dumps(load_lottie(path), separators=(",", ":")).encode("utf-8"))
+        except (OSError, ValueError):
+            sent = None
+        report.append({"file": name, "disk_bytes": os.path.getsize(path), "sent_bytes": sent})
+    return report
+
+
+if __name__ == "__main__":
+    rows = asset_report()
+    if not rows:
+        print(f"No animations found in {ANIMATIONS_DIR}")
+    for row in rows:
+        sent = f"{row['sent_bytes'] / 1024:8.1f} KB" if row["sent_bytes"] is not None else "  invalid"
+        print(f"{row['file']:45}{row['disk_bytes'] / 1024:8.1f} KB ->{sent}")
+    total_disk = sum(r["disk_bytes"] for r in rows)
+    total_sent = sum(r["sent_bytes"] or 0 for r in rows)
+    if rows:
+        print(f"{'Total':45}{total_disk / 1024:8.1f} KB ->{total_sent / 1024:8.1f} KB")
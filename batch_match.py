@@ -0,0 +1,189 @@
+"""Batch mode for the Resume Matcher: rank a folder of resume PDFs against one job description.
+
+Usage:
+    python batch_match.py --jd job.txt --resumes ./resumes --out ranked.csv
+    python batch_match.py --jd job.txt --resumes ./resumes --out ranked.jsonl --advice --concurrency 8
+
+Progress is checkpointed next to the output file, so an interrupted run picks up where it stopped
+and retries the resumes that failed. This process has its own rate-limit budget: next to a running
+app, give it a share of the account's limits (e.g. ``OPENAI_TPM=30000``).
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import cache
+import ingestion
+import metrics
+import resume_profile
+import scheduler
+import skill_matcher
+
+OUTPUT_FIELDS = ["rank", "file", "score", "matched", "missing", "years_experience", "advice", "error"]
+
+
+# --------------------------
+# Pipeline stages
+# --------------------------
+def _extract(path):
+    """Runs in a worker process: PDF bytes -> ``ingestion.Document``."""
+    try:
+        with open(path, "rb") as f:
+            return path, ingestion.extract_pdf(f.read()), None
+    except (OSError, ingestion.DocumentError) as e:
+        return path, None, str(e)
+
+
+def _score(path, document, error, job_desc):
+    row = {"file": path, "sha256": document.sha256 if document else None, "score": None, "matched": [],
+           "missing": [], "years_experience": None, "advice": "", "error": error}
+    if error:
+        return row, None
+    match = skill_matcher.match_skills(document.text, job_desc)
+    # Same profile as the Resume Matcher page, so batch advice prompts match the page's
+    profile = resume_profile.build_profile(document)
+    row.update(score=match.score, matched=match.matched, missing=match.missing,
+               years_experience=profile.years_experience)
+    return row, (profile.to_prompt(), match)
+
+
+def _advise(row, profile_text, match, job_desc):
+    from resume_matcher import match_resume_to_job  # only needed (and imported) for --advice
+
+    try:
+        # Queued behind interactive page calls sharing the same rate limits
+        with scheduler.priority(scheduler.BATCH):
+            row["advice"] = match_resume_to_job(profile_text, job_desc, skill_match=match).strip()
+    except Exception as e:
+        row["error"] = f"advice failed: {e}"
+    return row
+
+
+# --------------------------
+# Checkpointing
+# --------------------------
+def load_checkpoint(path, jd_key) -> dict:
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                if row.get("jd_key") == jd_key:
+                    done[row["file"]] = row
+    return done
+
+
+def _append_checkpoint(handle, row, jd_key):
+    # Failed rows (unreadable PDF, advice hit a 429/5xx) are left out so a resumed run retries them
+    if handle and not row.get("error"):
+        handle.write(json.dumps({**row, "jd_key": jd_key}, ensure_ascii=False) + "\n")
+        handle.flush()
+
+
+# --------------------------
+# Python API
+# --------------------------
+def rank_resumes(job_desc, paths, advice=False, workers=None, concurrency=4, checkpoint=None, progress=None):
+    """Score every resume in ``paths`` against ``job_desc`` and return rows ranked best-first.
+
+    PDFs are extracted in a process pool; optional LLM advice runs with at most ``concurrency``
+    requests in flight. Rows already present in ``checkpoint`` (a JSONL path) for the same job
+    description and advice setting are reused, and new rows are appended as they finish; rows
+    that failed are not checkpointed, so a resumed run tries them again.
+    """
+    jd_key = cache.make_key(job_desc, advice)
+    done = load_checkpoint(checkpoint, jd_key)
+    todo = [p for p in paths if p not in done]
+    rows = list(done.values())
+
+    handle = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as processes, ThreadPoolExecutor(max_workers=concurrency) as threads:
+            advice_futures = []
+            for future in as_completed([processes.submit(_extract, p) for p in todo]):
+                row, context = _score(*future.result(), job_desc)
+                if advice and context:
+                    advice_futures.append(threads.submit(_advise, row, *context, job_desc))
+                    continue
+                rows.append(row)
+                _append_checkpoint(handle, row, jd_key)
+                if progress:
+                    progress(len(rows), len(paths))
+            for future in as_completed(advice_futures):
+                row = future.result()
+                rows.append(row)
+                _append_checkpoint(handle, row, jd_key)
+                if progress:
+                    progress(len(rows), len(paths))
+    finally:
+        if handle:
+            handle.close()
+
+    rows.sort(key=lambda r: (r["score"] is None, -(r["score"] or 0), r["file"]))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+def write_results(rows, out_path):
+    """Write ranked rows as CSV, or JSONL when ``out_path`` ends in ``.jsonl``."""
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        if out_path.endswith(".jsonl"):
+            for row in rows:
+                f.write(json.dumps({k: row.get(k) for k in OUTPUT_FIELDS}, ensure_ascii=False) + "\n")
+            return
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                **{k: row.get(k) for k in OUTPUT_FIELDS},
+                "matched": "; ".join(row["matched"]),
+                "missing": "; ".join(row["missing"]),
+            })
+
+
+# --------------------------
+# CLI
+# --------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a folder of resume PDFs against one job description.")
+    parser.add_argument("--jd", required=True, help="text file containing the job description")
+    parser.add_argument("--resumes", required=True, help="folder of .pdf resumes (searched recursively)")
+    parser.add_argument("--out", default="ranked_resumes.csv", help="output .csv or .jsonl file")
+    parser.add_argument("--advice", action="store_true", help="also ask GPT-4 for improvement advice per resume")
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=4, help="max LLM requests in flight with --advice")
+    parser.add_argument("--checkpoint", default=None, help="progress file (default: <out>.checkpoint.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+    metrics.start()
+
+    with open(args.jd, encoding="utf-8") as f:
+        job_desc = f.read()
+    paths = sorted(glob.glob(os.path.join(args.resumes, "**", "*.pdf"), recursive=True))
+    if not paths:
+        parser.error(f"no .pdf files found under {args.resumes}")
+
+    checkpoint = args.checkpoint or args.out + ".checkpoint.jsonl"
+    if args.fresh and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} resumes", end="", file=sys.stderr, flush=True)
+
+    rows = rank_resumes(job_desc, paths, advice=args.advice, workers=args.workers,
+                        concurrency=args.concurrency, checkpoint=checkpoint, progress=progress)
+    print(file=sys.stderr)
+    write_results(rows, args.out)
+    print(f"Wrote {len(rows)} ranked resumes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Startup benchmark: what each page costs to import, measured with ``python -X importtime``.
+
+Usage (from the repository root):
+    python benchmarks/import_time.py            # table of page import costs + heaviest packages
+    python benchmarks/import_time.py --json     # machine-readable report
+    python benchmarks/import_time.py --runs 5   # best of 5 cold imports per target
+
+Every measurement runs in a fresh interpreter, so each number is a true cold import.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What the app imports before the Home page renders (streamlit_app.py's own imports)
+STARTUP = ["streamlit", "assets", "importlib", "metrics"]
+PAGES = [
+    "resume_matcher",
+    "global_insights",
+    "course_recommendations",
+    "career_path_explorer",
+    "skill_builder",
+    "mock_interview",
+    "hackathon_internships",
+    "industry_trends",
+]
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_time(modules, preload=()):
+    """Cold-import ``modules`` after ``preload`` in a new interpreter.
+
+    Returns ``(total microseconds, {top-level package: microseconds spent in its modules})``; time spent
+    importing ``preload`` is excluded so pages are measured on top of the app shell.
+    """
+    statements = [f"import {m}" for m in preload]
+    statements += ["import sys", "sys.stderr.write('--measure--\\n')"] + [f"import {m}" for m in modules]
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(statements)],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    total, packages = 0, defaultdict(int)
+    measuring = False
+    for line in proc.stderr.splitlines():
+        if line == "--measure--":
+            measuring = True
+            continue
+        match = LINE.match(line)
+        if not (measuring and match):
+            continue
+        self_us, cumulative, indent, name = match.groups()
+        if len(indent) == 1:  # top of an import tree: its cumulative time includes everything below
+            total += int(cumulative)
+        packages[name.split(".")[0]] += int(self_us)
+    return total, dict(packages)
+
+
+def best_of(runs, modules, preload=()):
+    results = [import_time(modules, preload) for _ in range(runs)]
+    return min(results, key=lambda r: r[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import cost of the app shell and each page.")
+    parser.add_argument("--runs", type=int, default=3, help="repeat each measurement and keep the fastest")
+    parser.add_argument("--top", type=int, default=10, help="how many of the heaviest packages to list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {"startup_us": best_of(args.runs, STARTUP)[0], "pages": {}, "eager_us": None, "heaviest": {}}
+    for page in PAGES:
+        try:
+            total, packages = best_of(args.runs, [page], preload=STARTUP)
+            report["pages"][page] = {"import_us": total, "packages": packages}
+        except RuntimeError as e:
+            report["pages"][page] = {"import_us": None, "error": str(e)}
+    try:
+        # The old behaviour: every page imported before Home renders
+        report["eager_us"] = report["startup_us"] + best_of(args.runs, PAGES, preload=STARTUP)[0]
+    except RuntimeError as e:
+        report["eager_error"] = str(e)
+
+    heaviest = defaultdict(int)
+    for page in report["pages"].values():
+        for name, us in page.get("packages", {}).items():
+            heaviest[name] = max(heaviest[name], us)
+    report["heaviest"] = dict(sorted(heaviest.items(), key=lambda kv: -kv[1])[: args.top])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    ms = lambda us: f"{us / 1000:8.1f} ms" if us is not None else "   failed"
+    print(f"{'App shell (lazy startup)':32}{ms(report['startup_us'])}")
+    print(f"{'All pages imported eagerly':32}{ms(report['eager_us'])}")
+    print("\nFirst visit to each page (on top of the shell):")
+    for name, page in report["pages"].items():
+        print(f"  {name:30}{ms(page['import_us'])}" + (f"  ({page['error']})" if "error" in page else ""))
+    print("\nHeaviest packages pulled in by a page:")
+    for name, us in report["heaviest"].items():
+        print(f"  {name:30}{ms(us)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""Load test: N concurrent sessions per page against local fake OpenAI and Nominatim servers.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py                          # every page, 4 sessions each
+    python benchmarks/load_test.py --pages mock_interview --sessions 16
+    python benchmarks/load_test.py --latency 1.0 --tokens-per-second 30 --reply-tokens 400
+    python benchmarks/load_test.py --identical              # every session sends the same inputs
+    python benchmarks/load_test.py --compare benchmarks/results/<earlier run>.json
+
+Each page's ``run()`` is driven through Streamlit's AppTest: a first load, the page's main
+interaction (which calls the model), and a plain rerun. Reported per page: the latency of each
+step (p50/p95 across sessions), end-to-end time per session, wall time and peak RSS. Results
+are written to ``benchmarks/results/`` so runs can be compared before and after a change.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+STEP_TIMEOUT = 300  # seconds AppTest waits for one script run
+
+PAGES = [
+    "resume_matcher",
+    "global_insights",
+    "course_recommendations",
+    "career_path_explorer",
+    "skill_builder",
+    "mock_interview",
+    "hackathon_internships",
+    "industry_trends",
+]
+CITIES = ["Berlin", "London", "Bengaluru", "Tokyo", "Toronto", "Austin", "Singapore", "Nairobi"]
+TOPICS = ["Flutter", "Cybersecurity", "Data Science", "Rust", "Kubernetes", "UX Design", "MLOps", "Go"]
+DOMAINS = ["AI", "Cybersecurity", "Web Dev", "Cloud", "Data Engineering", "Game Dev", "Robotics", "FinTech"]
+JOB_DESCRIPTION = """We are hiring a Python developer with 2+ years of experience in Django, REST APIs,
+PostgreSQL, Docker and AWS. Familiarity with React, CI/CD and unit testing is a plus."""
+RESUME_TEXT = """Jane Doe - Software Engineer
+Experience: 3 years building web services in Python, Flask and Django at Acme Corp (2021-2024).
+Skills: Python, Django, REST, PostgreSQL, Docker, Git, Linux, JavaScript, React.
+Education: B.Tech in Computer Science, 2021. Certifications: AWS Cloud Practitioner."""
+ANSWER = "I would clarify the requirements, sketch a design, discuss trade-offs and test it."
+
+_WORDS = """design build scale debug test deploy migrate profile secure refactor monitor document
+service cache queue database pipeline cluster endpoint schema feature release incident team deadline
+customer conflict mentor estimate prioritize negotiate legacy distributed mobile realtime offline
+latency budget outage rollback review ownership ambiguity tradeoff stakeholder backlog""".split()
+
+
+# --------------------------
+# Fake OpenAI-compatible server
+# --------------------------
+def fake_reply(prompt: str, reply_tokens: int, rng: random.Random) -> str:
+    """A reply in the shape the page that sent ``prompt`` expects."""
+    if "hackathon" in prompt and "JSON list" in prompt:
+        return json.dumps([{"name": f"Hack {i}", "date": "2030-01-0" + str(i), "description": "A weekend build event."}
+                           for i in range(1, 7)])
+    if "internship" in prompt and "JSON list" in prompt:
+        return json.dumps([{"company": f"Company {i}", "title": "Software Intern", "start": "June",
+                            "description": "Work on backend services."} for i in range(1, 7)])
+    if '"roles"' in prompt:
+        return json.dumps({
+            "roles": [{"title": f"Role {i}", "description": "Builds things.", "skills": ["Python", "SQL", "Cloud"]}
+                      for i in range(5)],
+            "companies": {"global": ["Google", "Microsoft"], "local": ["Local Co"]},
+            "skills": [{"name": s, "beginner": 40, "expert": 90} for s in ("Python", "SQL", "ML", "Cloud", "Git")],
+            "tip": "Explore local job boards.",
+        })
+    if '"score"' in prompt:
+        return json.dumps({"score": 7, "strengths": "Clear structure.", "improvements": "Add a concrete example."})
+    if "numbered list" in prompt:
+        # Random wording so the question bank's near-duplicate filter keeps them
+        return "\n".join(f"{i}. How would you {' '.join(rng.sample(_WORDS, 10))}?" for i in range(1, 11))
+    return " ".join(rng.choice(_WORDS) for _ in range(reply_tokens))
+
+
+class FakeServer:
+    """OpenAI chat completions (plain and SSE) and Nominatim ``/search`` on one local port."""
+
+    def __init__(self, latency=0.2, tokens_per_second=200.0, reply_tokens=200, geocode_latency=0.05):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.geocode_latency = geocode_latency
+        self.requests = {"chat": 0, "stream": 0, "geocode": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="fake-servers", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/search":
+                    self._send_json({"error": "not found"}, 404)
+                    return
+                server._count("geocode")
+                time.sleep(server.geocode_latency)
+                query = parse_qs(url.query).get("q", [""])[0]
+                digest = hashlib.sha256(query.encode("utf-8")).digest()
+                lat, lon = digest[0] / 255 * 120 - 60, digest[1] / 255 * 360 - 180
+                self._send_json([{"lat": str(lat), "lon": str(lon), "display_name": query.title()}])
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json({"error": "not found"}, 404)
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                prompt = request["messages"][-1]["content"] if request.get("messages") else ""
+                rng = random.Random()
+                words = fake_reply(prompt, server.reply_tokens, rng).split(" ")
+                model = request.get("model", "fake")
+                usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(words),
+                         "total_tokens": len(prompt) // 4 + len(words)}
+                time.sleep(server.latency)
+                if request.get("stream"):
+                    server._count("stream")
+                    self._stream(words, model)
+                    return
+                server._count("chat")
+                time.sleep(len(words) / server.tokens_per_second)
+                self._send_json({
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+
+            def _chunk(self, payload):
+                data = f"data: {payload}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, words, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+                for i, word in enumerate(words):
+                    delta = {"content": word if i == 0 else " " + word}
+                    self._chunk(json.dumps({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}))
+                    time.sleep(1 / server.tokens_per_second)
+                self._chunk(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+                self._chunk("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+# --------------------------
+# Page scenarios
+# --------------------------
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _resume_pdf() -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), RESUME_TEXT, fontsize=11)
+    return doc.tobytes()
+
+
+def scenario(page, i, resume):
+    """``[(step name, action)]`` for session ``i``; each action prepares widgets on the AppTest before a run."""
+    pick = lambda values: values[i % len(values)] + ("" if i < len(values) else f" {i}")
+    upload = lambda label: lambda at: _widget(at.file_uploader, label).set_value(("resume.pdf", resume, "application/pdf"))
+    click = lambda label: lambda at: _widget(at.button, label).click()
+
+    def fill(widgets, label, value, then=None):
+        def action(at):
+            _widget(getattr(at, widgets), label).set_value(value)
+            if then:
+                then(at)
+        return action
+
+    if page == "resume_matcher":
+        return [("upload", upload("📄 Upload your resume (PDF only)")),
+                ("match", fill("text_area", "📝 Paste the Job Description Here:", JOB_DESCRIPTION,
+                               click("🔍 Match Resume")))]
+    if page == "global_insights":
+        return [("search", fill("text_input", "📍 Search a location (e.g., Berlin, Silicon Valley, Tokyo):", pick(CITIES))),
+                ("insights", click("📈 Get Global Insights"))]
+    if page == "course_recommendations":
+        return [("recommend", fill("text_input", "📘 Enter topics (comma-separated):", pick(TOPICS),
+                                   click("📚 Get Recommendations")))]
+    if page == "career_path_explorer":
+        return [("insights", fill("text_input", "Enter domain (e.g. AI, Cybersecurity, Web Dev):", pick(DOMAINS),
+                                  click("Generate Career Insights"))),
+                ("toggle level", fill("radio", "🎯 Choose Roadmap Level:", "Expert"))]
+    if page == "skill_builder":
+        return [("upload", upload("📄 Upload Your Resume (PDF format)")),
+                ("analyze", click("🔍 Analyze Resume"))]
+    if page == "mock_interview":
+        def answer_all(at):
+            for area in at.text_area:
+                area.set_value(ANSWER)
+            _widget(at.button, "📝 Submit Answers for Feedback").click()
+        return [("questions", click("🎯 Generate Interview Questions")), ("feedback", answer_all)]
+    if page == "hackathon_internships":
+        return [("find", fill("text_input", "📍 Enter your location:", pick(CITIES),
+                              click("🔍 Find Opportunities")))]
+    if page == "industry_trends":
+        return [("search", fill("text_input", "📍 Enter a location (e.g., Bengaluru, London, California):", pick(CITIES))),
+                ("trends", click("📊 Show Industry Trends"))]
+    raise ValueError(f"no scenario for page {page!r}")
+
+
+def run_session(page, i, resume) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(f"import {page}\n{page}.run()\n", default_timeout=STEP_TIMEOUT)
+    steps, errors = {}, []
+    started = time.perf_counter()
+    for name, action in [("load", None)] + scenario(page, i, resume) + [("rerun", None)]:
+        try:
+            if action:
+                action(at)
+            t = time.perf_counter()
+            at.run()
+            steps[name] = time.perf_counter() - t
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {e}")
+            break
+        errors += [f"{name}: {exc.message}" for exc in at.exception]
+    return {"steps": steps, "total": time.perf_counter() - started, "errors": errors}
+
+
+# --------------------------
+# Measurement
+# --------------------------
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource  # no /proc: peak since start is the best available
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+class PeakMemory:
+    """Samples RSS on a background thread while the block runs."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.start = self.peak = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.start = self.peak = _rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+def summarize(values) -> dict:
+    return {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "max": max(values) if values else None}
+
+
+def run_page(page, sessions, identical, resume) -> dict:
+    with PeakMemory() as memory, ThreadPoolExecutor(max_workers=sessions) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda i: run_session(page, 0 if identical else i, resume), range(sessions)))
+        wall = time.perf_counter() - started
+    step_names = list(dict.fromkeys(name for r in results for name in r["steps"]))
+    return {
+        "steps": {name: summarize([r["steps"][name] for r in results if name in r["steps"]]) for name in step_names},
+        "end_to_end": summarize([r["total"] for r in results]),
+        "wall_seconds": wall,
+        "peak_rss_mb": memory.peak / 2 ** 20,
+        "rss_growth_mb": (memory.peak - memory.start) / 2 ** 20,
+        "errors": sorted({e for r in results for e in r["errors"]}),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --------------------------
+# Reporting
+# --------------------------
+def print_report(report, baseline=None):
+    ms = lambda s: f"{s * 1000:8.0f} ms" if s is not None else "        -"
+
+    def delta(now, before):
+        if now is None or not before:
+            return ""
+        return f" ({(now - before) / before * 100:+.0f}%)"
+
+    config = report["config"]
+    print(f"{config['sessions']} sessions per page, model latency {config['latency']}s, "
+          f"{config['tokens_per_second']} tokens/s, {config['reply_tokens']} tokens per reply")
+    for page, result in report["pages"].items():
+        before = (baseline or {}).get("pages", {}).get(page, {})
+        print(f"\n{page}  wall {result['wall_seconds']:.2f}s{delta(result['wall_seconds'], before.get('wall_seconds'))}"
+              f"  peak RSS {result['peak_rss_mb']:.0f} MB{delta(result['peak_rss_mb'], before.get('peak_rss_mb'))}")
+        rows = list(result["steps"].items()) + [("end to end", result["end_to_end"])]
+        for name, stats in rows:
+            old = before.get("end_to_end") if name == "end to end" else before.get("steps", {}).get(name)
+            print(f"  {name:16} p50{ms(stats['p50'])}{delta(stats['p50'], (old or {}).get('p50'))}"
+                  f"   p95{ms(stats['p95'])}{delta(stats['p95'], (old or {}).get('p95'))}")
+        for error in result["errors"]:
+            print(f"  ! {error}")
+    print(f"\nFake server requests: {report['server_requests']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive every page with concurrent sessions against local fake servers.")
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=PAGES)
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent sessions per page")
+    parser.add_argument("--latency", type=float, default=0.2, help="model time to first token (seconds)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="model generation speed")
+    parser.add_argument("--reply-tokens", type=int, default=200, help="length of free-text replies")
+    parser.add_argument("--geocode-latency", type=float, default=0.05, help="Nominatim response time (seconds)")
+    parser.add_argument("--identical", action="store_true", help="all sessions send the same inputs")
+    parser.add_argument("--cache-dir", default=None, help="reuse a cache directory (default: a fresh one per run)")
+    parser.add_argument("--out", default=None, help="results file (default: benchmarks/results/load_test-<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to show changes against")
+    args = parser.parse_args(argv)
+
+    server = FakeServer(args.latency, args.tokens_per_second, args.reply_tokens, args.geocode_latency).start()
+    # Point the app at the fakes before any of its modules are imported
+    os.environ.update({
+        "LLM_BACKEND": "openai",
+        "OPENAI_KEY": "load-test",
+        "OPENAI_BASE_URL": server.url + "/v1",
+        "NOMINATIM_URL": server.url,
+        "CACHE_DIR": args.cache_dir or tempfile.mkdtemp(prefix="load-test-cache-"),
+    })
+    os.environ.pop("REGIONAL_DB", None)
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import metrics
+
+    resume = _resume_pdf()
+    report = {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "pages": {},
+    }
+    for page in args.pages:
+        print(f"{page}...", file=sys.stderr, flush=True)
+        report["pages"][page] = run_page(page, args.sessions, args.identical, resume)
+    report["server_requests"] = dict(server.requests)
+    report["metrics"] = metrics.snapshot()
+    server.stop()
+
+    out = args.out or os.path.join(RESULTS_DIR, f"load_test-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
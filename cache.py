@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --------------------------
+# Cache settings
+# --------------------------
+CACHE_DIR = os.environ.get("CACHE_DIR", ".cache")
+CACHE_DB = os.path.join(CACHE_DIR, "cache.sqlite3")
+MEMORY_MAX_ENTRIES = 512
+DISK_MAX_ENTRIES = 5000
+
+
+def make_key(*parts) -> str:
+    """Content-address any JSON-serialisable parts (order-sensitive, dict-key-insensitive)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --------------------------
+# In-memory tier
+# --------------------------
+class LRUCache:
+    """Thread-safe LRU with a per-entry time-to-live."""
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --------------------------
+# On-disk tier
+# --------------------------
+class SQLiteCache:
+    """Persistent key/value store shared by every session (values are stored as JSON)."""
+
+    def __init__(self, path=CACHE_DB, namespace="default", max_entries=DISK_MAX_ENTRIES):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                       namespace TEXT NOT NULL,
+                       key TEXT NOT NULL,
+                       value TEXT NOT NULL,
+                       expires_at REAL,
+                       accessed_at REAL NOT NULL,
+                       PRIMARY KEY (namespace, key)
+                   )"""
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        item = self.lookup(key)
+        return item[0] if item else None
+
+    def lookup(self, key):
+        """Return ``(value, expires_at)`` or ``None`` when missing or expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            conn.commit()
+        return json.loads(value), expires_at
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            self._prune(conn, now)
+            conn.commit()
+
+    def _prune(self, conn, now):
+        conn.execute(
+            "DELETE FROM entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at < ?",
+            (self.namespace, now),
+        )
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)).fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                """DELETE FROM entries WHERE namespace = ? AND key IN (
+                       SELECT key FROM entries WHERE namespace = ? ORDER BY accessed_at LIMIT ?
+                   )""",
+                (self.namespace, self.namespace, count - self.max_entries),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+
+
+# --------------------------
+# Memory + disk
+# --------------------------
+class TieredCache:
+    """Memory LRU in front of the SQLite store, with hit/miss counters."""
+
+    def __init__(self, namespace, memory_max_entries=MEMORY_MAX_ENTRIES, disk_max_entries=DISK_MAX_ENTRIES, path=CACHE_DB):
+        self.namespace = namespace
+        self.memory = LRUCache(memory_max_entries)
+        self.disk = SQLiteCache(path, namespace, disk_max_entries)
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        try:
+            item = self.disk.lookup(key)
+        except (sqlite3.Error, OSError):
+            item = None  # a broken disk tier must never take a page down
+        if item is not None:
+            value, expires_at = item
+            self._count("disk_hits")
+            self.memory.set(key, value, expires_at - time.time() if expires_at else None)
+            return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value, ttl=None):
+        self._count("sets")
+        self.memory.set(key, value, ttl)
+        try:
+            self.disk.set(key, value, ttl)
+        except (sqlite3.Error, OSError):
+            pass
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        return stats
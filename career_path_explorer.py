@@ -1,74 +1,188 @@
 import streamlit as st
 import json
-from openai import OpenAI
-from streamlit_lottie import st_lottie
-from fpdf import FPDF
-import plotly.graph_objects as go
-
-# Initialize OpenAI
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# Load Lottie
-def load_lottiefile(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-# Generate roadmap chart
-def generate_roadmap_chart(level="Beginner"):
-    skills = ["Python", "Machine Learning", "Deep Learning", "Cloud Deployment", "AI Ethics"]
-    beginner = [90, 60, 40, 30, 20]
-    expert = [100, 95, 90, 85, 70]
-    y_data = beginner if level == "Beginner" else expert
+import openai_api
+import assets
+import cache
+
+# Career reports change slowly; reuse them for a day
+CACHE_TTL = 24 * 60 * 60
+
+# Rendered downloads, keyed by format and a hash of the report; memory only, never shared disk paths
+_exports = cache.LRUCache(max_entries=128)
+
+# Roadmap figures per (report, level); derived data only, so toggling the level never refetches
+_charts = cache.LRUCache(max_entries=256)
+
+LEVELS = {"Beginner": "beginner", "Expert": "expert"}
+MAX_ROADMAP_SKILLS = 8
+
+# Generate roadmap chart from the domain's own skills and proficiency targets
+def generate_roadmap_chart(skills, level="Beginner"):
+    import plotly.graph_objects as go  # heavy; only loaded once a chart is drawn
+
+    names = [s["name"] for s in skills]
+    y_data = [s[LEVELS[level]] for s in skills]
 
     fig = go.Figure()
-    fig.add_trace(go.Bar(x=skills, y=y_data, name=f"{level} Roadmap", marker_color='indigo'))
+    fig.add_trace(go.Bar(x=names, y=y_data, name=f"{level} Roadmap", marker_color='indigo'))
     fig.update_layout(
         title=f"{level} Skill Roadmap",
         xaxis_title="Skill",
         yaxis_title="Proficiency (%)",
+        yaxis_range=[0, 100],
         height=400
     )
     return fig
 
-# Generate markdown career insights
-def get_career_insights(domain, country):
+def get_roadmap_chart(result, level):
+    key = cache.make_key(result["key"], level)
+    fig = _charts.get(key)
+    if fig is None:
+        fig = generate_roadmap_chart(result["insights"]["skills"], level)
+        _charts.set(key, fig)
+    return fig
+
+# Parse the model's JSON into a complete insights dict (missing parts become empty)
+def parse_insights(text: str) -> dict:
+    start, end = text.find("{"), text.rfind("}")
+    data = json.loads(text[start:end + 1]) if start >= 0 and end > start else {}
+
+    roles = []
+    for role in data.get("roles") or []:
+        if isinstance(role, dict) and role.get("title"):
+            roles.append({
+                "title": str(role["title"]),
+                "description": str(role.get("description", "")),
+                "skills": [str(s) for s in role.get("skills") or []],
+            })
+
+    def level(value, default):
+        try:
+            return max(0, min(100, int(value)))
+        except (TypeError, ValueError):
+            return default
+
+    skills = []
+    for skill in data.get("skills") or []:
+        if isinstance(skill, dict) and skill.get("name"):
+            skills.append({"name": str(skill["name"]), "beginner": level(skill.get("beginner"), 40), "expert": level(skill.get("expert"), 90)})
+    if not skills:
+        # No targets returned: fall back to the skills the roles mention most often
+        counts = {}
+        for role in roles:
+            for name in role["skills"]:
+                counts[name] = counts.get(name, 0) + 1
+        skills = [{"name": n, "beginner": 40, "expert": 90} for n in sorted(counts, key=counts.get, reverse=True)]
+
+    companies = data.get("companies") or {}
+    return {
+        "roles": roles,
+        "skills": skills[:MAX_ROADMAP_SKILLS],
+        "companies": {
+            "global": [str(c) for c in companies.get("global") or []],
+            "local": [str(c) for c in companies.get("local") or []],
+        },
+        "tip": str(data.get("tip", "")),
+    }
+
+# Render insights as markdown (shown on the page and used for the downloads)
+def insights_to_markdown(insights, domain, country) -> str:
+    lines = [f"## Career Paths in {domain} ({country})", ""]
+    for role in insights["roles"]:
+        lines.append(f"### {role['title']}")
+        if role["description"]:
+            lines.append(role["description"])
+        if role["skills"]:
+            lines.append(f"- **Key skills:** {', '.join(role['skills'])}")
+        lines.append("")
+    if insights["companies"]["global"] or insights["companies"]["local"]:
+        lines.append("## Companies Hiring")
+        if insights["companies"]["global"]:
+            lines.append(f"- **Global:** {', '.join(insights['companies']['global'])}")
+        if insights["companies"]["local"]:
+            lines.append(f"- **In {country}:** {', '.join(insights['companies']['local'])}")
+        lines.append("")
+    if insights["tip"]:
+        lines += ["## Tip", insights["tip"]]
+    return "\n".join(lines).strip()
+
+# Only replies that parse into at least one role are worth caching for a day
+def _usable(text) -> bool:
+    try:
+        return bool(parse_insights(text)["roles"])
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+# Generate structured career insights
+def get_career_insights(domain, country) -> dict:
     prompt = f"""
 You are a career counselor. For the industry/domain "{domain}" in "{country}", provide:
 
 1. 5 relevant career paths (job title + 1-line description + 3-5 key skills)
 2. Top global and country-specific companies hiring
-3. Close with a tip encouraging users to explore local job platforms
-
-Format clearly in markdown with headings and bullet points.
+3. The 5-8 most important skills in this domain, each with a target proficiency (0-100) for a beginner roadmap and for an expert roadmap
+4. A closing tip encouraging users to explore local job platforms
+
+Return only JSON in this format:
+{{
+  "roles": [{{"title": "...", "description": "...", "skills": ["...", "..."]}}],
+  "companies": {{"global": ["..."], "local": ["..."]}},
+  "skills": [{{"name": "...", "beginner": 40, "expert": 90}}],
+  "tip": "..."
+}}
 """
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
-            {"role": "system", "content": "You are a career guidance expert."},
+            {"role": "system", "content": "You are a career guidance expert who answers in JSON."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.7,
+        cache_ttl=CACHE_TTL,
+        cache_if=_usable,
     )
-    return response.choices[0].message.content.strip()
+    return parse_insights(response)
 
 # Export as PDF
-def generate_pdf(text_md):
+def generate_pdf(text_md) -> bytes:
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=11)
     cleaned = text_md.encode("ascii", "ignore").decode()
     pdf.multi_cell(0, 10, cleaned)
-    path = "/mnt/data/career_insights.pdf"
-    pdf.output(path)
-    return path
+    data = pdf.output(dest="S")  # rendered in memory: str on fpdf 1.x, bytearray on fpdf2
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
 
 # Export as Markdown
-def generate_md(text_md):
-    path = "/mnt/data/career_insights.md"
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text_md)
-    return path
+def generate_md(text_md) -> bytes:
+    return text_md.encode("utf-8")
+
+EXPORTERS = {"pdf": generate_pdf, "md": generate_md}
+
+# Rendered export bytes; built on first request per report and format (build=False only peeks)
+def get_export(text_md, fmt, build=True):
+    key = cache.make_key(fmt, text_md)
+    data = _exports.get(key)
+    if data is None and build:
+        data = EXPORTERS[fmt](text_md)
+        _exports.set(key, data)
+    return data
+
+# Download buttons; the PDF is only rendered once the user asks for it
+def render_downloads(result_md):
+    st.markdown("### 📎 Download")
+    col1, col2 = st.columns(2)
+    with col1:
+        pdf = get_export(result_md, "pdf", build=False)
+        if pdf is None and st.button("📄 Prepare PDF"):
+            with st.spinner("📄 Rendering PDF..."):
+                pdf = get_export(result_md, "pdf")
+        if pdf is not None:
+            st.download_button("📄 Download PDF", pdf, "career_insights.pdf", mime="application/pdf")
+    with col2:
+        st.download_button("📝 Download Markdown", get_export(result_md, "md"), "career_insights.md", mime="text/markdown")
 
 # Main App
 def run():
@@ -76,11 +190,7 @@ def run():
     st.title("🚀 Career Path Explorer")
 
     # 🎞️ Lottie Animation
-    try:
-        lottie = load_lottiefile("animations/Animation - 1749285017326.json")
-        st_lottie(lottie, height=200)
-    except:
-        st.info("🎞️ Animation not found.")
+    assets.show_lottie("animations/Animation - 1749285017326.json", fallback="🎞️ Animation not found.", height=200)
 
     # 📝 App Description
     st.markdown("""
@@ -109,31 +219,37 @@ Simply enter your domain and country below to begin!
     roadmap_level = st.radio("🎯 Choose Roadmap Level:", ["Beginner", "Expert"], horizontal=True)
 
     # 🚀 Generate Insights Button
+    # The structured report is kept in session state: level changes, downloads and reruns reuse it
     if st.button("Generate Career Insights"):
         with st.spinner("🔎 Fetching results..."):
             try:
-                result_md = get_career_insights(domain, country)
-
-                # 📘 Career Insights Section
-                st.markdown("### 📘 Career Insights")
-                st.markdown(result_md)
-
-                # 📊 Roadmap Chart
-                st.markdown("### 📊 Skill Roadmap")
-                st.plotly_chart(generate_roadmap_chart(roadmap_level), use_container_width=True)
-
-                # 📎 Download Options
-                st.markdown("### 📎 Download")
-                col1, col2 = st.columns(2)
-                with col1:
-                    pdf_file = generate_pdf(result_md)
-                    st.download_button("📄 Download PDF", open(pdf_file, "rb"), "career_insights.pdf", mime="application/pdf")
-                with col2:
-                    md_file = generate_md(result_md)
-                    st.download_button("📝 Download Markdown", open(md_file, "rb"), "career_insights.md", mime="text/markdown")
-
+                insights = get_career_insights(domain, country)
             except Exception as e:
+                st.session_state.career_result = None
                 st.error(f"Error generating results: {e}")
+                return
+        if not insights["roles"]:
+            st.session_state.career_result = None
+            st.error("Error generating results: the response could not be read. Please try again.")
+            return
+        markdown = insights_to_markdown(insights, domain, country)
+        st.session_state.career_result = {"key": cache.make_key(insights), "insights": insights, "markdown": markdown}
+
+    result = st.session_state.get("career_result")
+    if result:
+        # 📘 Career Insights Section
+        st.markdown("### 📘 Career Insights")
+        st.markdown(result["markdown"])
+
+        # 📊 Roadmap Chart
+        st.markdown("### 📊 Skill Roadmap")
+        if result["insights"]["skills"]:
+            st.plotly_chart(get_roadmap_chart(result, roadmap_level), use_container_width=True)
+        else:
+            st.info("No skill targets were returned for this domain.")
+
+        # 📎 Download Options
+        render_downloads(result["markdown"])
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,285 @@
+"""Record and replay LLM and Nominatim traffic at the client boundary.
+
+    CASSETTE=traffic.jsonl CASSETTE_MODE=record streamlit run streamlit_app.py   # real calls, saved
+    CASSETTE=traffic.jsonl CASSETTE_MODE=replay streamlit run streamlit_app.py   # offline, same timing
+    CASSETTE_SPEED=10 ...                                                         # replay 10x faster (0 = no delays)
+
+Recording wraps the configured LLM backend and the geocoder's HTTP session, so every page's calls
+are captured with their original latency (and per-delta timing for streams). In replay mode
+nothing leaves the process. A request is matched to its exact recording first, then to a
+recording of the same prompt shape (model, system message and ``max_tokens``), so prompts that
+embed today's date or a different resume still replay. Repeated requests cycle through their
+recordings in order. The completion and geocode caches are bypassed in both modes.
+
+Usage:
+    python cassettes.py traffic.jsonl    # what a cassette contains
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict
+
+import cache
+
+# --------------------------
+# Cassette settings
+# --------------------------
+MODES = ("record", "replay")
+PREVIEW_CHARS = 80  # prompt text kept in the file for readability; matching uses hashes
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recording for a request."""
+
+
+def mode() -> str:
+    """``"record"``, ``"replay"`` or ``""`` (off), from ``CASSETTE`` / ``CASSETTE_MODE``."""
+    if not os.environ.get("CASSETTE"):
+        return ""
+    value = os.environ.get("CASSETTE_MODE", "replay").lower()
+    if value not in MODES:
+        raise ValueError(f"Unknown CASSETTE_MODE '{value}'. Choose from: {', '.join(MODES)}")
+    return value
+
+
+def speed() -> float:
+    return float(os.environ.get("CASSETTE_SPEED", 1.0))
+
+
+def _wait(seconds, factor):
+    if factor > 0 and seconds > 0:
+        time.sleep(seconds / factor)
+
+
+class Cassette:
+    """Interactions in a JSONL file, indexed by exact key and by prompt shape."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._exact = defaultdict(list)
+        self._shapes = defaultdict(list)
+        self._cursor = Counter()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, interaction):
+        self._exact[(interaction["kind"], interaction["key"])].append(interaction)
+        if interaction.get("shape"):
+            self._shapes[(interaction["kind"], interaction["shape"])].append(interaction)
+
+    def _next(self, index, lookup):
+        recordings = index.get(lookup)
+        if not recordings:
+            return None
+        position = self._cursor[lookup] % len(recordings)
+        self._cursor[lookup] += 1
+        return recordings[position]
+
+    def find(self, kind, key, shape=None) -> dict:
+        with self._lock:
+            found = self._next(self._exact, (kind, key))
+            if found is None and shape:
+                found = self._next(self._shapes, (kind, shape))
+        if found is None:
+            raise CassetteMiss(f"No {kind} recording in {self.path} for this request")
+        return found
+
+    def record(self, interaction):
+        interaction = {**interaction, "recorded_at": time.time()}
+        with self._lock:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction) + "\n")
+            self._index(interaction)
+
+    def interactions(self) -> list:
+        with self._lock:
+            return [i for recordings in self._exact.values() for i in recordings]
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    global _cassette
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(os.environ["CASSETTE"])
+    return _cassette
+
+
+# --------------------------
+# LLM boundary (implements openai_api.Backend)
+# --------------------------
+def _llm_request(model, messages, max_tokens, temperature, params):
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    return {
+        "key": cache.make_key(model, messages, max_tokens, temperature, params),
+        "shape": cache.make_key(model, system, max_tokens),
+        "model": model,
+        "prompt": (messages[-1]["content"] if messages else "").strip()[:PREVIEW_CHARS],
+    }
+
+
+class RecordingBackend:
+    """Passes calls to ``inner`` and appends each completed one to the cassette."""
+
+    def __init__(self, inner, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.name = inner.name
+
+    def retry_after(self, error):
+        return self.inner.retry_after(error)
+
+    def complete(self, model, messages, max_tokens, temperature, **params):
+        started = time.monotonic()
+        completion = self.inner.complete(model, messages, max_tokens, temperature, **params)
+        self.cassette.record({
+            "kind": "llm", **_llm_request(model, messages, max_tokens, temperature, params),
+            "elapsed": time.monotonic() - started, "completion": asdict(completion),
+        })
+        return completion
+
+    def stream(self, model, messages, max_tokens, temperature, **params):
+        started = time.monotonic()
+        deltas = []
+        for delta in self.inner.stream(model, messages, max_tokens, temperature, **params):
+            deltas.append([time.monotonic() - started, delta])
+            yield delta
+        # Only complete streams are recorded; an abandoned one would replay truncated
+        self.cassette.record({
+            "kind": "llm_stream", **_llm_request(model, messages, max_tokens, temperature, params),
+            "elapsed": time.monotonic() - started, "deltas": deltas,
+        })
+
+
+class ReplayBackend:
+    """Answers from the cassette with the recorded timing, scaled by ``CASSETTE_SPEED``."""
+
+    name = "replay"
+
+    def __init__(self, cassette: Cassette, factor: float = 1.0):
+        self.cassette = cassette
+        self.factor = factor
+
+    def retry_after(self, error):
+        return None
+
+    def complete(self, model, messages, max_tokens, temperature, **params):
+        from openai_api import Completion
+
+        request = _llm_request(model, messages, max_tokens, temperature, params)
+        recording = self.cassette.find("llm", request["key"], request["shape"])
+        _wait(recording["elapsed"], self.factor)
+        return Completion(**recording["completion"])
+
+    def stream(self, model, messages, max_tokens, temperature, **params):
+        request = _llm_request(model, messages, max_tokens, temperature, params)
+        recording = self.cassette.find("llm_stream", request["key"], request["shape"])
+        started = time.monotonic()
+        for offset, delta in recording["deltas"]:
+            if self.factor > 0:
+                _wait(offset - (time.monotonic() - started) * self.factor, self.factor)
+            yield delta
+
+
+def wrap_backend(make_backend):
+    """The backend the gateway should use: ``make_backend()`` itself, recorded, or a replay."""
+    current = mode()
+    if current == "replay":
+        return ReplayBackend(get_cassette(), speed())  # no client (or API key) needed
+    backend = make_backend()
+    return RecordingBackend(backend, get_cassette()) if current == "record" else backend
+
+
+# --------------------------
+# Geocoder boundary (the requests.Session used for Nominatim)
+# --------------------------
+class _Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        import requests
+
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (replayed)", response=self)
+
+
+def _geocode_key(url, params):
+    return cache.make_key(url.rsplit("/", 1)[-1], params or {})
+
+
+class RecordingSession:
+    def __init__(self, session, cassette: Cassette):
+        self.session = session
+        self.cassette = cassette
+        self.headers = session.headers
+
+    def get(self, url, params=None, **kwargs):
+        started = time.monotonic()
+        resp = self.session.get(url, params=params, **kwargs)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = None
+        self.cassette.record({
+            "kind": "geocode", "key": _geocode_key(url, params), "query": (params or {}).get("q"),
+            "elapsed": time.monotonic() - started, "status": resp.status_code, "body": body,
+        })
+        return resp
+
+
+class ReplaySession:
+    def __init__(self, cassette: Cassette, factor: float = 1.0):
+        self.cassette = cassette
+        self.factor = factor
+        self.headers = {}
+
+    def get(self, url, params=None, **kwargs):
+        import requests
+
+        try:
+            recording = self.cassette.find("geocode", _geocode_key(url, params))
+        except CassetteMiss as e:
+            raise requests.ConnectionError(str(e))  # the geocoder treats it like being offline
+        _wait(recording["elapsed"], self.factor)
+        return _Response(recording["status"], recording["body"])
+
+
+def wrap_session(session):
+    current = mode()
+    if current == "replay":
+        return ReplaySession(get_cassette(), speed())
+    return RecordingSession(session, get_cassette()) if current == "record" else session
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__.split("Usage:")[1].rstrip())
+        sys.exit(1)
+    interactions = Cassette(sys.argv[1]).interactions()
+    if not interactions:
+        sys.exit(f"{sys.argv[1]} has no recordings")
+    by_kind = defaultdict(list)
+    for interaction in interactions:
+        by_kind[interaction["kind"]].append(interaction)
+    for kind, items in sorted(by_kind.items()):
+        elapsed = sorted(i["elapsed"] for i in items)
+        print(f"{kind:12}{len(items):6} recordings  {len({i['key'] for i in items}):6} distinct"
+              f"  median {elapsed[len(elapsed) // 2] * 1000:7.0f} ms  max {elapsed[-1] * 1000:7.0f} ms")
@@ -1,15 +1,9 @@
 import streamlit as st
-import json
-from openai import OpenAI
-from streamlit_lottie import st_lottie
+import openai_api
+import assets
 
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# Load Lottie animation
-def load_lottiefile(fp):
-    with open(fp, "r", encoding="utf-8") as f:
-        return json.load(f)
+# Course lists are reused for a day
+CACHE_TTL = 24 * 60 * 60
 
 # Streamlit App
 def run():
@@ -17,10 +11,8 @@ def run():
     st.markdown('<div style="text-align:center; max-width:700px; margin:auto;">', unsafe_allow_html=True)
 
     # 🎞️ Lottie Animation
-    try:
-        st_lottie(load_lottiefile("animations/Animation - 1749284783217.json"), height=160)
-    except Exception:
-        st.info("⚠️ Lottie animation not loaded. Please check the file path.")
+    assets.show_lottie("animations/Animation - 1749284783217.json",
+                       fallback="⚠️ Lottie animation not loaded. Please check the file path.", height=160)
 
     # 🎓 Title and Description
     st.title("🎯 Smart Course Recommendations")
@@ -45,6 +37,13 @@ Get started below and grow your skills with the best resources available online!
 
     # 📚 Button to trigger recommendations
     if st.button("📚 Get Recommendations") and topics.strip():
+        # Normalise the topic list so equivalent inputs share a cache entry: case-insensitive
+        # dedupe keeping the first spelling, then an order that doesn't depend on set iteration
+        unique = {}
+        for t in topics.split(","):
+            if t.strip():
+                unique.setdefault(t.strip().lower(), t.strip())
+        topics = ", ".join(sorted(unique.values(), key=lambda t: (t.lower(), t)))
         prompt = f"""
 You are an expert education counselor. Suggest 10 high-quality online courses based on the following topics: {topics}.
 
@@ -58,17 +57,17 @@ Format the response as a numbered markdown list.
 """
         with st.spinner("🔍 Searching top-rated courses..."):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-4",  # Or use gpt-3.5-turbo
+                st.markdown("### 🧠 Top Course Recommendations")
+                st.write_stream(openai_api.chat(
                     messages=[
                         {"role": "system", "content": "You are a helpful course recommender."},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=1000,
                     temperature=1.0,
-                )
-                st.markdown("### 🧠 Top Course Recommendations")
-                st.markdown(response.choices[0].message.content.strip())
+                    cache_ttl=CACHE_TTL,
+                    stream=True,
+                ))
             except Exception as e:
                 st.error(f"❌ Error: {e}")
 
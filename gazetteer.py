@@ -0,0 +1,142 @@
+import csv
+import math
+import os
+import threading
+from dataclasses import dataclass
+
+# --------------------------
+# Offline reverse geocoding
+# --------------------------
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.csv")
+EARTH_RADIUS_KM = 6371.0
+SNAP_RADIUS_KM = 80  # clicks within this distance of a known place snap to it
+GRID_DEGREES = 0.5  # clicks far from any place are rounded to this grid
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    region: str
+    country: str
+    lat: float
+    lon: float
+
+    @property
+    def label(self) -> str:
+        parts = [self.name]
+        for part in (self.region, self.country):
+            if part and part != parts[-1]:
+                parts.append(part)
+        return ", ".join(parts)
+
+
+def _unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def _chord_to_km(chord):
+    return 2 * math.asin(min(1.0, chord / 2)) * EARTH_RADIUS_KM
+
+
+class KDTree:
+    """Static 3-d tree over points on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors orders points exactly like
+    great-circle distance, so a plain Euclidean nearest-neighbour search is correct
+    everywhere, including across the antimeridian and near the poles.
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self._nodes = []  # (point index, axis, left node, right node)
+        self._root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left = self._build(indices[:mid], depth + 1)
+        right = self._build(indices[mid + 1:], depth + 1)
+        self._nodes[node] = (indices[mid], axis, left, right)
+        return node
+
+    def nearest(self, query):
+        """Return ``(point index, chord distance)`` of the point closest to ``query``."""
+        best = [-1, math.inf]
+
+        def visit(node):
+            if node < 0:
+                return
+            index, axis, left, right = self._nodes[node]
+            point = self.points[index]
+            dist = math.dist(point, query)
+            if dist < best[1]:
+                best[0], best[1] = index, dist
+            diff = query[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if abs(diff) < best[1]:
+                visit(far)
+
+        visit(self._root)
+        return best[0], best[1]
+
+
+class Gazetteer:
+    def __init__(self, places):
+        self.places = places
+        self._tree = KDTree([_unit_vector(p.lat, p.lon) for p in places])
+
+    @classmethod
+    def from_csv(cls, path=GAZETTEER_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            places = [
+                Place(row["name"], row["region"], row["country"], float(row["lat"]), float(row["lon"]))
+                for row in csv.DictReader(f)
+            ]
+        return cls(places)
+
+    def nearest(self, lat, lon):
+        """Return ``(Place, distance_km)`` for the closest known place."""
+        index, chord = self._tree.nearest(_unit_vector(lat, lon))
+        return self.places[index], _chord_to_km(chord)
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer, loaded on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.from_csv()
+    return _gazetteer
+
+
+def snap(lat, lon, radius_km=SNAP_RADIUS_KM):
+    """Return the nearest named place within ``radius_km``, or ``None``."""
+    place, distance = get_gazetteer().nearest(lat, lon)
+    return place if distance <= radius_km else None
+
+
+def locate(lat, lon, radius_km=SNAP_RADIUS_KM):
+    """Map a map click to canonical ``(lat, lon, label)`` without any network call.
+
+    Clicks near a known place become that place; anywhere else is rounded to a coarse grid
+    and described relative to the nearest place, so nearby clicks share the same prompt.
+    """
+    place, distance = get_gazetteer().nearest(lat, lon)
+    if distance <= radius_km:
+        return place.lat, place.lon, place.label
+    lat = round(round(lat / GRID_DEGREES) * GRID_DEGREES, 2)
+    lon = round(round(lon / GRID_DEGREES) * GRID_DEGREES, 2)
+    place, distance = get_gazetteer().nearest(lat, lon)
+    return lat, lon, f"Lat: {lat:.2f}, Lon: {lon:.2f} (about {round(distance, -1):.0f} km from {place.label})"
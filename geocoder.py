@@ -0,0 +1,121 @@
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import cache
+import cassettes
+import metrics
+from rate_limit import TokenBucket
+from singleflight import SingleFlight
+
+# --------------------------
+# Nominatim settings
+# --------------------------
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org")
+USER_AGENT = "ElevateU-CareerCoach/1.0 (https://github.com/Chiku91/Personal-AI-Coach)"
+TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+# Nominatim usage policy: at most one request per second for the whole application
+REQUESTS_PER_SECOND = 1.0
+MAX_QUEUE_WAIT = 10  # seconds a lookup may wait for its turn before giving up
+
+FOUND_TTL = 30 * 24 * 60 * 60  # places rarely move
+NOT_FOUND_TTL = 24 * 60 * 60
+
+
+class GeocoderUnavailable(RuntimeError):
+    """The lookup couldn't be made (queue full, network or HTTP error); it may work if retried."""
+
+
+_bucket = TokenBucket(REQUESTS_PER_SECOND, capacity=1)
+_flights = SingleFlight()
+_cache = cache.TieredCache("geocode")
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session for Nominatim (recorded or replayed when ``CASSETTE`` is set)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                _session = cassettes.wrap_session(session)
+    return _session
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive form used as the cache key."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    query = re.sub(r"\s*,\s*", ", ", query)
+    return query.strip(" ,.;")
+
+
+def _search(query: str, labels: dict):
+    if not _bucket.acquire(timeout=MAX_QUEUE_WAIT):
+        metrics.inc("geocoder_requests_total", outcome="busy", **labels)
+        return None  # too busy; don't cache, the next attempt may succeed
+    started = time.monotonic()
+    try:
+        resp = get_session().get(
+            f"{NOMINATIM_URL}/search",
+            params={"q": query, "format": "json", "limit": 1},
+            timeout=TIMEOUT,
+        )
+        resp.raise_for_status()
+        results = resp.json()
+    except (requests.RequestException, ValueError):
+        metrics.inc("geocoder_requests_total", outcome="error", **labels)
+        return None
+    finally:
+        metrics.observe("geocoder_request_seconds", time.monotonic() - started, **labels)
+    metrics.inc("geocoder_requests_total", outcome="found" if results else "not_found", **labels)
+
+    if results:
+        result = results[0]
+        place = {
+            "lat": float(result["lat"]),
+            "lon": float(result["lon"]),
+            "display_name": result.get("display_name", query),
+        }
+    else:
+        place = {"lat": None, "lon": None, "display_name": None}
+    if not cassettes.mode():
+        _cache.set(normalize_query(query), place, ttl=FOUND_TTL if results else NOT_FOUND_TTL)
+    return place
+
+
+def search(query: str):
+    """Like ``geocode``, but raises ``GeocoderUnavailable`` rather than reporting a temporary
+    failure as "not found"."""
+    key = normalize_query(query or "")
+    if not key:
+        return None, None, None
+
+    labels = metrics.caller()
+    # While recording or replaying every lookup goes to the session, so none is missed or short-circuited
+    place = None if cassettes.mode() else _cache.get(key)
+    if place is None:
+        # Identical lookups in flight from other sessions share one request
+        place = _flights.do(key, _search, key, labels)
+    else:
+        metrics.inc("geocoder_requests_total", outcome="cached", **labels)
+    if place is None:
+        raise GeocoderUnavailable(f"Could not look up '{query}' right now")
+    return place["lat"], place["lon"], place["display_name"]
+
+
+def geocode(query: str):
+    """Forward-geocode ``query`` to ``(lat, lon, display_name)``, or ``(None, None, None)``."""
+    try:
+        return search(query)
+    except GeocoderUnavailable:
+        return None, None, None
@@ -1,33 +1,17 @@
 import streamlit as st
-import requests
-import folium
-from streamlit_folium import st_folium
-from openai import OpenAI
+import openai_api
+import geocoder
+import map_view
+import regional_store
 import datetime
 
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# -------------------------------
-# Geocoding: Nominatim OpenStreetMap
-# -------------------------------
-def geocode_location(query):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {"q": query, "format": "json", "limit": 1}
-    headers = {"User-Agent": "global-insights-app"}
-    try:
-        resp = requests.get(url, params=params, headers=headers)
-        if resp.ok and resp.json():
-            result = resp.json()[0]
-            return float(result["lat"]), float(result["lon"]), result["display_name"]
-    except Exception:
-        return None, None, None
-    return None, None, None
+# Regional reports are reused for 12 hours
+CACHE_TTL = 12 * 60 * 60
 
 # -------------------------------
 # GPT-4 Prompt for Market Insights
 # -------------------------------
-def get_global_insights(lat, lon, location_name):
+def get_global_insights(lat, lon, location_name, stream=False):
     prompt = f"""
 You are a global tech market analyst.
 
@@ -42,16 +26,17 @@ Include:
 
 Format the answer as a clear markdown summary.
 """
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You are an expert in global employment trends."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.7,
+        cache_ttl=CACHE_TTL,
+        stream=stream,
     )
-    return response.choices[0].message.content.strip()
+    return response if stream else response.strip()
 
 # -------------------------------
 # Streamlit App
@@ -86,6 +71,7 @@ def run():
         "address": "New Delhi, India",
         "clicked": False,
         "insights": "",
+        "insights_source": None,
         "last_updated": None,
     }
     for key, val in default_values.items():
@@ -95,55 +81,63 @@ def run():
     # 🌍 Search for a location
     location_input = st.text_input("📍 Search a location (e.g., Berlin, Silicon Valley, Tokyo):")
 
-    if location_input:
-        lat, lon, address = geocode_location(location_input)
-        if lat and lon:
-            st.session_state.lat = lat
-            st.session_state.lon = lon
-            st.session_state.address = address
-            st.session_state.clicked = True
+    # Geocode only when the search text changes, not on every rerun
+    if location_input and location_input != st.session_state.get("global_search"):
+        try:
+            lat, lon, address = geocoder.search(location_input)
+        except geocoder.GeocoderUnavailable:
+            # Not recorded as searched, so the next rerun tries again
+            st.warning("⏳ Location search is busy right now. Please try again in a moment.")
         else:
-            st.error("❌ Location not found. Please try another place.")
-
-    # 🗺️ Render the map
-    map_obj = folium.Map(location=[st.session_state.lat, st.session_state.lon], zoom_start=6)
-    folium.Marker(
-        location=[st.session_state.lat, st.session_state.lon],
-        tooltip="📍 Selected Location",
-        popup=st.session_state.address,
-        icon=folium.Icon(color="red", icon="briefcase")
-    ).add_to(map_obj)
-
-    click_data = st_folium(map_obj, height=500, width=700)
-
-    if click_data and click_data.get("last_clicked"):
-        clicked_lat = click_data["last_clicked"]["lat"]
-        clicked_lon = click_data["last_clicked"]["lng"]
-        st.session_state.lat = clicked_lat
-        st.session_state.lon = clicked_lon
-        st.session_state.address = f"Lat: {clicked_lat:.5f}, Lon: {clicked_lon:.5f}"
-        st.session_state.clicked = True
+            st.session_state.global_search = location_input
+            if lat and lon:
+                st.session_state.lat = lat
+                st.session_state.lon = lon
+                st.session_state.address = address
+                st.session_state.clicked = True
+            else:
+                st.error("❌ Location not found. Please try another place.")
+
+    # 🗺️ Render the map; clicks rerun only the map and update the selected location
+    map_view.location_map("global_map", "global_click", zoom_start=6, icon="briefcase")
 
     # 📈 Button to trigger insights
-    if st.button("📈 Get Global Insights"):
-        if not st.session_state.clicked:
-            st.warning("Please select or search a location.")
-        else:
-            with st.spinner("Fetching global insights..."):
-                try:
-                    st.session_state.insights = get_global_insights(
-                        st.session_state.lat,
-                        st.session_state.lon,
-                        st.session_state.address,
-                    )
-                    st.session_state.last_updated = datetime.datetime.now()
-                except Exception as e:
-                    st.error(f"⚠️ Failed to fetch insights: {e}")
+    fetch = st.button("📈 Get Global Insights")
+    if fetch and not st.session_state.clicked:
+        st.warning("Please select or search a location.")
+    elif fetch:
+        st.markdown(f"### 📍 Insights for: **{st.session_state.address}**")
+        # A report precomputed for a nearby hub is served straight from the local store
+        stored = regional_store.lookup("global_insights", st.session_state.lat, st.session_state.lon)
+        if stored:
+            st.session_state.insights = stored.report
+            st.session_state.insights_source = stored.describe()
+            st.session_state.last_updated = stored.generated
+            st.caption(f"🗂️ {st.session_state.insights_source}")
+            st.markdown(stored.report)
+            return
+
+        # 📊 Otherwise stream a new report in place, keeping the full text for later reruns
+        st.session_state.insights_source = None
+        st.session_state.last_updated = datetime.datetime.now()
+        st.caption(f"🕒 Last checked: {st.session_state.last_updated.strftime('%Y-%m-%d %H:%M:%S')}")
+        with st.spinner("Fetching global insights..."):
+            try:
+                st.session_state.insights = st.write_stream(get_global_insights(
+                    st.session_state.lat,
+                    st.session_state.lon,
+                    st.session_state.address,
+                    stream=True,
+                )).strip()
+            except Exception as e:
+                st.error(f"⚠️ Failed to fetch insights: {e}")
 
     # 📊 Show insights
-    if st.session_state.insights:
+    elif st.session_state.insights:
         st.markdown(f"### 📍 Insights for: **{st.session_state.address}**")
-        if st.session_state.last_updated:
+        if st.session_state.insights_source:
+            st.caption(f"🗂️ {st.session_state.insights_source}")
+        elif st.session_state.last_updated:
             st.caption(f"🕒 Last checked: {st.session_state.last_updated.strftime('%Y-%m-%d %H:%M:%S')}")
         st.markdown(st.session_state.insights)
 
@@ -1,45 +1,19 @@
 import streamlit as st
-import requests
-from openai import OpenAI
-import pandas as pd
+import openai_api
+import geocoder
 import datetime
-import json
-import re
-
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# Constants
-NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-
-# ----------- Geocoding ------------
-def geocode_location(location: str):
-    try:
-        resp = requests.get(
-            NOMINATIM_URL,
-            params={"q": location, "format": "json", "limit": 1},
-            headers={"User-Agent": "streamlit-app"}
-        )
-        if resp.ok and resp.json():
-            data = resp.json()[0]
-            return float(data["lat"]), float(data["lon"]), data.get("display_name", location)
-    except Exception:
-        return None, None, location
-    return None, None, location
+import json_stream
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ----------- Parse JSON from GPT response ------------
+# Objects are picked out of the list one by one, ignoring any text around it
 def extract_json_from_response(response_text: str):
-    try:
-        # Match everything inside square brackets (the JSON list)
-        json_match = re.search(r"\[.*\]", response_text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(0))
-    except Exception as e:
-        st.error(f"⚠️ Error extracting JSON: {e}")
-    return []
+    return json_stream.parse_array(response_text)
 
 # ----------- Hackathon Generator ------------
-def get_hackathons_from_openai(location: str) -> list:
+def get_hackathons_from_openai(location: str, stream=False):
     today = datetime.date.today()
     formatted_date = today.strftime("%B %d, %Y")
 
@@ -58,19 +32,20 @@ Return only the JSON list:
 ]
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You generate realistic hackathon data in JSON format."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.9,
+        stream=stream,
     )
-    return extract_json_from_response(response.choices[0].message.content.strip())
+    # Streaming yields each object as soon as its closing brace arrives
+    return json_stream.iter_objects(response) if stream else extract_json_from_response(response)
 
 # ----------- Internship Generator ------------
-def get_internships_from_openai(location: str, domain: str) -> list:
+def get_internships_from_openai(location: str, domain: str, stream=False):
     today = datetime.date.today()
     formatted_date = today.strftime("%B %d, %Y")
 
@@ -89,16 +64,51 @@ Return only the JSON list:
   ...
 ]
 """
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You generate realistic internship data in JSON format."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.9,
+        stream=stream,
     )
-    return extract_json_from_response(response.choices[0].message.content.strip())
+    # Streaming yields each object as soon as its closing brace arrives
+    return json_stream.iter_objects(response) if stream else extract_json_from_response(response)
+
+# ----------- Result Rendering ------------
+def hackathon_card(h: dict):
+    st.markdown(f"""
+    <div class="card">
+        <div class="title">🚀 {h.get("name", "Untitled Hackathon")}</div>
+        <div class="subtitle">📅 {h.get("date", "TBD")}</div>
+        <div class="desc">{h.get("description", "")}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def internship_card(i: dict):
+    st.markdown(f"""
+    <div class="card">
+        <div class="title">🏢 {i.get("company", "Unnamed Company")} – {i.get("title", "")}</div>
+        <div class="subtitle">🗓️ Starts: {i.get("start", "TBD")}</div>
+        <div class="desc">{i.get("description", "")}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+# ----------- Background producers ------------
+# Worker threads only fetch; every item goes through the queue and is rendered by run()
+def produce(events, stop, section, items):
+    try:
+        for item in items:
+            if stop.is_set():
+                return
+            events.put((section, "item", item))
+        events.put((section, "done", None))
+    except Exception as e:
+        events.put((section, "error", e))
+
+def locate(location: str):
+    yield geocoder.geocode(location)
 
 # ----------- Streamlit App ------------
 def run():
@@ -150,47 +160,68 @@ Just enter your location and domain, and click "Find Opportunities".
     ])
 
     if st.button("🔍 Find Opportunities"):
-        lat, lon, resolved_location = geocode_location(location_input)
-        if lat is None or lon is None:
-            st.error("❌ Could not determine location. Please try again.")
-            return
-
-        st.success(f"📌 Location found: **{resolved_location}** (Lat: {lat:.2f}, Lon: {lon:.2f})")
-        st.map(pd.DataFrame({"lat": [lat], "lon": [lon]}))
-
-        with st.spinner("🔎 Searching for hackathons..."):
-            hackathons = get_hackathons_from_openai(resolved_location)
-
-        with st.spinner("🔎 Searching for internships..."):
-            internships = get_internships_from_openai(resolved_location, domain_input)
-
-        # 🏆 Hackathon Results
-        if hackathons:
-            st.markdown(f"### 🏆 Upcoming Hackathons (after {datetime.date.today().strftime('%B %d, %Y')})")
-            for h in hackathons:
-                st.markdown(f"""
-                <div class="card">
-                    <div class="title">🚀 {h.get("name", "Untitled Hackathon")}</div>
-                    <div class="subtitle">📅 {h.get("date", "TBD")}</div>
-                    <div class="desc">{h.get("description", "")}</div>
-                </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("😕 No hackathons found. Try a different location.")
-
-        # 💼 Internship Results
-        if internships:
-            st.markdown(f"### 💼 Internship Opportunities in **{domain_input}**")
-            for i in internships:
-                st.markdown(f"""
-                <div class="card">
-                    <div class="title">🏢 {i.get("company", "Unnamed Company")} – {i.get("title", "")}</div>
-                    <div class="subtitle">🗓️ Starts: {i.get("start", "TBD")}</div>
-                    <div class="desc">{i.get("description", "")}</div>
-                </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("😕 No internships found. Try a different domain or location.")
+        # Reserve each section up-front so results land in order, whichever call finishes first
+        location_slot = st.empty()
+        hackathon_slot = st.empty()
+        internship_slot = st.empty()
+        location_slot.info("📍 Locating...")
+        hackathon_slot.info("🔎 Searching for hackathons...")
+        internship_slot.info("🔎 Searching for internships...")
+
+        # Geocode and both generations run concurrently and stream into one queue;
+        # Streamlit calls stay on this thread, so cards appear as each object completes
+        sections = {
+            "hackathons": (hackathon_slot, f"### 🏆 Upcoming Hackathons (after {datetime.date.today().strftime('%B %d, %Y')})",
+                           hackathon_card, "😕 No hackathons found. Try a different location."),
+            "internships": (internship_slot, f"### 💼 Internship Opportunities in **{domain_input}**",
+                            internship_card, "😕 No internships found. Try a different domain or location."),
+        }
+        boxes, counts = {}, {name: 0 for name in sections}
+        events, stop = queue.Queue(), threading.Event()
+        pool = ThreadPoolExecutor(max_workers=3)
+        try:
+            pool.submit(produce, events, stop, "location", locate(location_input))
+            pool.submit(produce, events, stop, "hackathons", get_hackathons_from_openai(location_input, stream=True))
+            pool.submit(produce, events, stop, "internships", get_internships_from_openai(location_input, domain_input, stream=True))
+            pending = 3
+            while pending:
+                section, kind, payload = events.get()
+                if kind != "item":
+                    pending -= 1
+                if section == "location":
+                    if kind == "error":
+                        payload = (None, None, None)
+                    elif kind == "done":
+                        continue
+                    lat, lon, resolved_location = payload
+                    if lat is None or lon is None:
+                        location_slot.error("❌ Could not determine location. Please try again.")
+                        hackathon_slot.empty()
+                        internship_slot.empty()
+                        return
+                    import pandas as pd
+
+                    with location_slot.container():
+                        st.success(f"📌 Location found: **{resolved_location}** (Lat: {lat:.2f}, Lon: {lon:.2f})")
+                        st.map(pd.DataFrame({"lat": [lat], "lon": [lon]}))
+                    continue
+
+                slot, header, card, empty_message = sections[section]
+                if kind == "item":
+                    if section not in boxes:
+                        boxes[section] = slot.container()
+                        boxes[section].markdown(header)
+                    with boxes[section]:
+                        card(payload)
+                    counts[section] += 1
+                elif kind == "error":
+                    (boxes[section] if section in boxes else slot).error(f"⚠️ Could not load results: {payload}")
+                elif counts[section] == 0:
+                    slot.info(empty_message)
+        finally:
+            # Stop producers and don't block the rerun on calls whose results are no longer needed
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     run()
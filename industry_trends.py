@@ -1,45 +1,47 @@
 import streamlit as st
-import requests
-import folium
-from openai import OpenAI
-from streamlit_folium import st_folium
+import openai_api
+import geocoder
+import gazetteer
+import map_view
+import regional_store
 import datetime
 
-# Initialize OpenAI
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# Geocoding with OpenStreetMap
-def search_place(query):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {"q": query, "format": "json", "limit": 1}
-    headers = {"User-Agent": "IndustryTrendsApp/1.0"}
-    response = requests.get(url, params=params, headers=headers)
-    if response.status_code == 200 and response.json():
-        data = response.json()[0]
-        return float(data["lat"]), float(data["lon"]), data.get("display_name", query)
-    return None, None, None
+# Regional reports are reused for 12 hours
+CACHE_TTL = 12 * 60 * 60
 
 # Fetch industry trends from OpenAI
-def get_industry_trends(lat, lon):
+def get_industry_trends(lat, lon, location_name=None, stream=False):
+    if location_name is None:
+        location_name = gazetteer.locate(lat, lon)[2]
     prompt = (
         f"You are a market analyst. Provide an engaging analysis of current industry trends "
-        f"around latitude {lat} and longitude {lon}. Include:\n"
+        f"around {location_name} (latitude {lat}, longitude {lon}). Include:\n"
         f"- Key local companies and what domains they're in\n"
         f"- In-demand technologies and skills\n"
         f"- Job market status (growth, hiring freeze, remote trends, etc.)\n"
         f"- Career opportunities for tech graduates in the region\n"
         f"Use clear Markdown formatting and bullet points."
     )
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You are a helpful industry trends assistant."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.7,
+        cache_ttl=CACHE_TTL,
+        stream=stream,
     )
-    return response.choices[0].message.content.strip()
+    return response if stream else response.strip()
+
+# Location header shown above a trends report
+def show_location_box(address, checked_at):
+    st.markdown(f"""
+    <div class="location-box">
+        <b>📌 Trends for:</b> {address}<br>
+        <small>🕒 Last updated: {checked_at.strftime('%A, %d %B %Y %I:%M %p')}</small>
+    </div>
+    """, unsafe_allow_html=True)
 
 # Main Streamlit App
 def run():
@@ -87,6 +89,7 @@ Just enter a city, region, or country below to get started. The map will update
         "lon": 77.2090,
         "address": "New Delhi, India",
         "trends": "",
+        "trends_source": None,
         "clicked": False,
         "last_checked": None,
     }.items():
@@ -95,48 +98,62 @@ Just enter a city, region, or country below to get started. The map will update
 
     place_search = st.text_input("📍 Enter a location (e.g., Bengaluru, London, California):")
 
-    if place_search:
-        lat, lon, address = search_place(place_search)
-        if lat and lon:
-            st.session_state.lat = lat
-            st.session_state.lon = lon
-            st.session_state.address = address
-            st.session_state.clicked = True
+    # Geocode only when the search text changes, not on every rerun
+    if place_search and place_search != st.session_state.get("trends_search"):
+        try:
+            lat, lon, address = geocoder.search(place_search)
+        except geocoder.GeocoderUnavailable:
+            # Not recorded as searched, so the next rerun tries again
+            st.warning("⏳ Location search is busy right now. Please try again in a moment.")
         else:
-            st.warning("❌ Location not found. Please try again.")
-
-    # Map
-    m = folium.Map(location=[st.session_state.lat, st.session_state.lon], zoom_start=12)
-    folium.Marker(
-        location=[st.session_state.lat, st.session_state.lon],
-        popup=st.session_state.address,
-        tooltip="📍 Selected Location",
-        icon=folium.Icon(color="red", icon="info-sign")
-    ).add_to(m)
-
-    st_folium(m, height=500, width=700)
-
-    if st.button("📊 Show Industry Trends"):
-        if not st.session_state.clicked:
-            st.warning("Please enter a location or click on the map.")
-        else:
-            with st.spinner("Fetching data..."):
-                try:
-                    st.session_state.trends = get_industry_trends(
-                        st.session_state.lat, st.session_state.lon
-                    )
-                    st.session_state.last_checked = datetime.datetime.now()
-                except Exception as e:
-                    st.error(f"Error: {e}")
-
-    if st.session_state.trends:
-        st.markdown(f"""
-        <div class="location-box">
-            <b>📌 Trends for:</b> {st.session_state.address}<br>
-            <small>🕒 Last updated: {st.session_state.last_checked.strftime('%A, %d %B %Y %I:%M %p')}</small>
-        </div>
-        """, unsafe_allow_html=True)
-
+            st.session_state.trends_search = place_search
+            if lat and lon:
+                st.session_state.lat = lat
+                st.session_state.lon = lon
+                st.session_state.address = address
+                st.session_state.clicked = True
+            else:
+                st.warning("❌ Location not found. Please try again.")
+
+    # Map; clicks rerun only the map and update the selected location
+    map_view.location_map("trends_map", "trends_click", zoom_start=12, icon="info-sign")
+
+    show_trends = st.button("📊 Show Industry Trends")
+    if show_trends and not st.session_state.clicked:
+        st.warning("Please enter a location or click on the map.")
+    elif show_trends:
+        # A report precomputed for a nearby hub is served straight from the local store
+        stored = regional_store.lookup("industry_trends", st.session_state.lat, st.session_state.lon)
+        if stored:
+            st.session_state.trends = stored.report
+            st.session_state.trends_source = stored.describe()
+            st.session_state.last_checked = stored.generated
+            show_location_box(st.session_state.address, st.session_state.last_checked)
+            st.caption(f"🗂️ {st.session_state.trends_source}")
+            st.markdown(f"""<div class="trend-box">{stored.report}</div>""", unsafe_allow_html=True)
+            return
+
+        # Otherwise stream the report into the styled box as it is generated
+        st.session_state.trends_source = None
+        st.session_state.last_checked = datetime.datetime.now()
+        show_location_box(st.session_state.address, st.session_state.last_checked)
+        trend_box = st.empty()
+        with st.spinner("Fetching data..."):
+            try:
+                parts = []
+                for chunk in get_industry_trends(
+                    st.session_state.lat, st.session_state.lon, st.session_state.address, stream=True
+                ):
+                    parts.append(chunk)
+                    trend_box.markdown(f"""<div class="trend-box">{"".join(parts)}</div>""", unsafe_allow_html=True)
+                st.session_state.trends = "".join(parts).strip()
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+    elif st.session_state.trends:
+        show_location_box(st.session_state.address, st.session_state.last_checked)
+        if st.session_state.trends_source:
+            st.caption(f"🗂️ {st.session_state.trends_source}")
         st.markdown(f"""<div class="trend-box">{st.session_state.trends}</div>""", unsafe_allow_html=True)
 
 if __name__ == "__main__":
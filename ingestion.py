@@ -0,0 +1,66 @@
+import hashlib
+from dataclasses import dataclass, field
+
+import cache
+
+# --------------------------
+# Upload limits
+# --------------------------
+MAX_PDF_BYTES = 10 * 1024 * 1024
+MAX_PDF_PAGES = 25
+
+# Extracted resumes stay in process memory only (never on disk); shared by every page and session
+_documents = cache.LRUCache(max_entries=256)
+
+
+class DocumentError(ValueError):
+    """The upload can't be ingested (too large, too many pages or not a readable PDF)."""
+
+
+@dataclass
+class Document:
+    sha256: str
+    text: str
+    pages: list = field(default_factory=list)
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def extract_pdf(data: bytes) -> Document:
+    """Extract text from PDF bytes once per unique file; repeat calls are served from memory."""
+    if len(data) > MAX_PDF_BYTES:
+        raise DocumentError(f"File is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB.")
+
+    digest = content_hash(data)
+    document = _documents.get(digest)
+    if document is not None:
+        return document
+
+    import fitz  # PyMuPDF
+
+    try:
+        with fitz.open(stream=data, filetype="pdf") as pdf:
+            if pdf.page_count > MAX_PDF_PAGES:
+                raise DocumentError(f"PDF has {pdf.page_count} pages; the limit is {MAX_PDF_PAGES}.")
+            pages = [page.get_text() for page in pdf]
+            metadata = {key: value for key, value in (pdf.metadata or {}).items() if value}
+    except DocumentError:
+        raise
+    except Exception as e:
+        raise DocumentError(f"Could not read PDF: {e}") from e
+
+    document = Document(sha256=digest, text="".join(pages), pages=pages, metadata=metadata)
+    _documents.set(digest, document)
+    return document
+
+
+def ingest_upload(uploaded_file) -> Document:
+    """Extract a Streamlit ``UploadedFile`` (safe to call on every rerun)."""
+    return extract_pdf(uploaded_file.getvalue())
@@ -0,0 +1,115 @@
+import json
+import re
+
+# --------------------------
+# Incremental JSON-array parsing
+# --------------------------
+_DANGLING_TAIL = re.compile(r'(?:,\s*"(?:[^"\\]|\\.)*"\s*:?\s*|,\s*|:\s*)$')
+
+
+class ArrayStream:
+    """Yield each top-level object of a JSON array while the text is still arriving.
+
+    Feed it chunks as they come off the wire; every ``{...}`` that completes at the top
+    level of the array is returned immediately. Text before the array (prose, code fences)
+    and after its closing bracket is ignored, and a truncated last object is repaired on
+    ``close()`` when possible.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0  # next character of _buf to scan
+        self._stack = []  # open "[" / "{" containers
+        self._in_string = False
+        self._escaped = False
+        self._start = None  # _buf index where the current top-level object began
+        self._start_depth = 0  # containers already open when that object began
+        self._count = 0
+        self.done = False
+
+    def _top_level_object(self) -> bool:
+        return "{" not in self._stack
+
+    def feed(self, chunk: str) -> list:
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        items = []
+        buf, i = self._buf, self._pos
+        while i < len(buf):
+            char = buf[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._stack:
+                    self._in_string = True
+            elif char in "[{":
+                if char == "{" and self._top_level_object():
+                    self._start, self._start_depth = i, len(self._stack)
+                self._stack.append(char)
+            elif char in "]}" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._start is not None and self._top_level_object():
+                    item = _loads(buf[self._start:i + 1])
+                    if item is not None:
+                        items.append(item)
+                        self._count += 1
+                    self._start = None
+                elif char == "]" and not self._stack and self._count:
+                    # An empty "[...]" before any object is prose like "[see below]"; keep looking
+                    self.done = True
+                    break
+            i += 1
+
+        # Keep only the unfinished object, so long streams don't rescan old text
+        keep = self._start if self._start is not None else i
+        self._buf, self._pos = buf[keep:], i - keep
+        if self._start is not None:
+            self._start = 0
+        return items
+
+    def close(self) -> list:
+        """Finish the stream, salvaging a truncated final object if it can be closed cleanly."""
+        if self.done or self._start is None:
+            return []
+        text = self._buf
+        if self._escaped:
+            text = text[:-1]  # cut mid-escape
+        if self._in_string:
+            text += '"'
+        text = _DANGLING_TAIL.sub("", text.rstrip())
+        closers = "".join("}" if c == "{" else "]" for c in reversed(self._stack[self._start_depth:]))
+        self.done = True
+        item = _loads(text + closers)
+        return [item] if item is not None else []
+
+
+def _loads(text):
+    try:
+        item = json.loads(text)
+    except ValueError:
+        try:
+            item = json.loads(re.sub(r",\s*([}\]])", r"\1", text))  # trailing commas
+        except ValueError:
+            return None
+    return item if isinstance(item, dict) else None
+
+
+def iter_objects(chunks):
+    """Objects from a stream of text chunks (e.g. ``openai_api.chat(..., stream=True)``)."""
+    parser = ArrayStream()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
+
+
+def parse_array(text: str) -> list:
+    """Objects from a complete response, tolerant of surrounding prose and a truncated tail."""
+    return list(iter_objects([text]))
@@ -0,0 +1,71 @@
+import streamlit as st
+import folium
+from streamlit_folium import st_folium, generate_leaflet_string
+import gazetteer
+
+# --------------------------
+# Shared location-picker map for the map pages
+# --------------------------
+MAP_HEIGHT = 500
+MAP_WIDTH = 700
+
+
+def _base_map(key, zoom_start):
+    """The tile layer only, built once per session and page.
+
+    st_folium regenerates the map's HTML on every call and the output only settles after
+    the first pass, so the map is warmed once here; after that the component is never
+    remounted and only the marker layer and centre change between reruns.
+    """
+    cache_key = f"{key}_base_map"
+    if cache_key not in st.session_state:
+        base = folium.Map(location=[0, 0], zoom_start=zoom_start)
+        base.render()
+        generate_leaflet_string(base)
+        st.session_state[cache_key] = base
+    return st.session_state[cache_key]
+
+
+def _marker_layer(lat, lon, popup, tooltip, icon):
+    layer = folium.FeatureGroup(name="selection")
+    folium.Marker(
+        location=[lat, lon],
+        tooltip=tooltip,
+        popup=popup,
+        icon=folium.Icon(color="red", icon=icon)
+    ).add_to(layer)
+    return layer
+
+
+def _handle_click(key, click_key):
+    # st_folium keeps returning the last click, so only handle a click once
+    click = (st.session_state.get(key) or {}).get("last_clicked")
+    if click and click != st.session_state.get(click_key):
+        st.session_state[click_key] = click
+        # Snap to the nearest named place offline so the prompt (and its cache entry) is shared
+        lat, lon, address = gazetteer.locate(click["lat"], click["lng"])
+        st.session_state.lat = lat
+        st.session_state.lon = lon
+        st.session_state.address = address
+        st.session_state.clicked = True
+
+
+@st.fragment
+def location_map(key, click_key, zoom_start, icon, tooltip="📍 Selected Location"):
+    """Map of the session's selected location (``st.session_state.lat/lon/address``).
+
+    Runs as a fragment: a map click reruns only the map, not the whole page. Only
+    ``last_clicked`` is sent back to Python, so panning and zooming don't trigger reruns.
+    """
+    st_folium(
+        _base_map(key, zoom_start),
+        key=key,
+        height=MAP_HEIGHT,
+        width=MAP_WIDTH,
+        center=(st.session_state.lat, st.session_state.lon),
+        feature_group_to_add=_marker_layer(
+            st.session_state.lat, st.session_state.lon, st.session_state.address, tooltip, icon
+        ),
+        returned_objects=["last_clicked"],
+        on_change=lambda: _handle_click(key, click_key),
+    )
@@ -0,0 +1,233 @@
+"""Process-wide metrics for outbound LLM and geocoder calls.
+
+Counters and rolling latency summaries are labelled by the module and function that made the
+call (e.g. ``global_insights`` / ``get_global_insights``). They can be read three ways:
+
+- ``render()`` returns the Prometheus text format;
+- ``METRICS_PORT=9108`` serves it at ``http://localhost:9108/metrics`` (loopback only; set
+  ``METRICS_HOST=0.0.0.0`` to let a scraper on another machine reach it);
+- ``METRICS_JSONL=metrics.jsonl`` appends a snapshot every ``METRICS_INTERVAL`` seconds (default 60).
+
+Usage:
+    python metrics.py metrics.jsonl    # p50/p95/p99 per call site from the latest snapshot
+"""
+import atexit
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# --------------------------
+# Metrics settings
+# --------------------------
+WINDOW_SECONDS = 300  # summaries cover the last five minutes
+MAX_SAMPLES = 2048  # per series, newest kept
+QUANTILES = (0.5, 0.95, 0.99)
+DEFAULT_INTERVAL = 60
+DEFAULT_HOST = "127.0.0.1"  # call counts and latencies stay off the network unless asked for
+
+# Frames from these modules are plumbing; the caller is the first frame outside them
+INTERNAL_MODULES = {
+    __name__, "openai_api", "scheduler", "singleflight", "geocoder", "rate_limit",
+    "threading", "contextlib", "concurrent.futures.thread",
+}
+
+HELP = {
+    "llm_requests_total": "Completion requests by outcome (ok, error, cached).",
+    "llm_request_seconds": "Completion latency including queueing and retries.",
+    "llm_queue_seconds": "Time a completion waited for the scheduler to admit it.",
+    "llm_retries_total": "Completion attempts retried after a transient error.",
+    "llm_tokens_total": "Prompt and completion tokens (counted locally for streams).",
+    "llm_finish_total": "Completions by finish_reason.",
+    "geocoder_requests_total": "Geocoding lookups by outcome (found, not_found, cached, busy, error).",
+    "geocoder_request_seconds": "Nominatim request latency.",
+}
+
+
+class _Summary:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)  # (monotonic time, value)
+
+    def observe(self, value, now):
+        self.count += 1
+        self.sum += value
+        self.samples.append((now, value))
+
+    def quantiles(self, now) -> dict:
+        while self.samples and now - self.samples[0][0] > WINDOW_SECONDS:
+            self.samples.popleft()
+        values = sorted(v for _, v in self.samples)
+        if not values:
+            return {q: None for q in QUANTILES}
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in QUANTILES}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._summaries = {}  # (name, labels) -> _Summary
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary()
+            summary.observe(value, time.monotonic())
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            summaries = []
+            for (name, labels), summary in sorted(self._summaries.items(), key=lambda kv: kv[0]):
+                row = {"name": name, "labels": dict(labels), "count": summary.count, "sum": summary.sum}
+                row.update({f"p{int(q * 100)}": v for q, v in summary.quantiles(now).items()})
+                summaries.append(row)
+        return {"time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "counters": counters, "summaries": summaries}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (counters and summaries)."""
+        snap = self.snapshot()
+        lines, described = [], set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for row in snap["counters"]:
+            header(row["name"], "counter")
+            lines.append(f"{row['name']}{_labels(row['labels'])} {row['value']}")
+        for row in snap["summaries"]:
+            header(row["name"], "summary")
+            for q in QUANTILES:
+                value = row[f"p{int(q * 100)}"]
+                if value is not None:
+                    lines.append(f"{row['name']}{_labels(row['labels'], quantile=q)} {value}")
+            lines.append(f"{row['name']}_sum{_labels(row['labels'])} {row['sum']}")
+            lines.append(f"{row['name']}_count{_labels(row['labels'])} {row['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels, **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+render = registry.render
+snapshot = registry.snapshot
+
+
+def caller() -> dict:
+    """``module`` and ``function`` labels for the code that made the current outbound call."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in INTERNAL_MODULES:
+            return {"module": module, "function": frame.f_code.co_name}
+        frame = frame.f_back
+    return {"module": "unknown", "function": "unknown"}
+
+
+# --------------------------
+# Exporters
+# --------------------------
+_started = False
+_start_lock = threading.Lock()
+
+
+def write_jsonl(path):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(snapshot()) + "\n")
+
+
+def serve(port: int, host: str = DEFAULT_HOST):
+    """Serve ``/metrics`` on a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start():
+    """Start the exporters configured by ``METRICS_PORT`` / ``METRICS_JSONL``; safe to call on every rerun."""
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        port = os.environ.get("METRICS_PORT")
+        if port:
+            try:
+                serve(int(port), os.environ.get("METRICS_HOST", DEFAULT_HOST))
+            except OSError:
+                pass  # another process (e.g. a second app instance) already serves this port
+        path = os.environ.get("METRICS_JSONL")
+        if path:
+            interval = float(os.environ.get("METRICS_INTERVAL", DEFAULT_INTERVAL))
+
+            def writer():
+                while True:
+                    time.sleep(interval)
+                    write_jsonl(path)
+
+            threading.Thread(target=writer, name="metrics-jsonl", daemon=True).start()
+            atexit.register(write_jsonl, path)  # final snapshot for CLI runs
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__.split("Usage:")[1].rstrip())
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    if not lines:
+        sys.exit(f"{sys.argv[1]} is empty")
+    latest = json.loads(lines[-1])
+    fmt = lambda v: f"{v * 1000:9.0f} ms" if v is not None else "        -"
+    print(f"Snapshot {latest['time']}")
+    for row in latest["summaries"]:
+        labels = row["labels"]
+        where = (f"{labels['module']}.{labels['function']}" if "function" in labels
+                 else ",".join(f"{k}={v}" for k, v in labels.items()))
+        print(f"{row['name']:26}{where:50}{row['count']:7}{fmt(row['p50'])}{fmt(row['p95'])}{fmt(row['p99'])}")
@@ -1,65 +1,114 @@
 import streamlit as st
-from openai import OpenAI
+import openai_api
+import question_bank
+import cache
+import assets
 import datetime
-import re
 import json
-from streamlit_lottie import st_lottie
-
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# Load Lottie animation
-def load_lottie(filepath: str):
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-lottie_json = load_lottie("animations/Animation - 1749286005992.json")
-
-# Generate unique interview questions
-def generate_questions(interview_type: str) -> list[str]:
-    prompt = f"""You are an HR professional. Generate exactly ten {interview_type.lower()} interview questions suitable for final-year computer science/IT engineering students. Return them as a numbered list. Make the questions unique each time."""
-    
-    response = client.chat.completions.create(
-        model="gpt-4",  # Use gpt-4 for better coherence
-        messages=[
-            {"role": "system", "content": "You are a professional interviewer."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=600,
-        temperature=0.8,
-    )
-
-    questions_text = response.choices[0].message.content.strip()
-    return [re.sub(r"^\d+\.\s*", "", q).strip() for q in questions_text.splitlines() if q.strip()]
-
-# Get AI feedback on Q&A
-def get_feedback(questions, answers) -> str:
-    qa_block = "\n\n".join(f"Q{i+1}: {q}\nA{i+1}: {a}" for i, (q, a) in enumerate(zip(questions, answers)))
-    prompt = f"""You are a seasoned technical interviewer. Review the following interview responses and provide:
-
-1. Strengths of the candidate's answers  
-2. Areas of improvement  
-3. A rating out of 10 for each answer  
-
-Interview Q&A:
-{qa_block}
-
-Return feedback in this format:
-Question 1 Feedback (rating x/10): ...
-Question 2 Feedback (rating x/10): ...
-(continue for all)
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Draw ten interview questions this session hasn't seen yet (local bank, refilled in the background)
+def generate_questions(interview_type: str, seen=()) -> list:
+    return question_bank.draw_questions(interview_type, question_bank.QUESTIONS_PER_SET, exclude=seen)
+
+EVAL_CONCURRENCY = 5
+EMPTY_ANSWER = {"score": 0, "strengths": "", "improvements": "No answer was given. Try answering even briefly: structure, examples and reasoning all count."}
+
+# Evaluations are keyed by (question, answer), so editing one answer re-scores only that answer.
+# Kept in memory only: answers are the user's own writing.
+_evaluations = cache.LRUCache(max_entries=2048)
+
+# The JSON evaluation in a reply, or None if there isn't a valid one
+def _parse_json(text: str):
+    match = re.search(r"\{.*\}", text, re.S)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+        score = data.get("score")
+        return {
+            "score": max(0, min(10, int(score))) if score is not None else None,
+            "strengths": str(data.get("strengths", "")).strip(),
+            "improvements": str(data.get("improvements", "")).strip(),
+        }
+    except (AttributeError, ValueError, TypeError):
+        return None
+
+# Only scored JSON replies are kept; anything else is asked again next time
+def _usable(text: str) -> bool:
+    evaluation = _parse_json(text)
+    return evaluation is not None and evaluation["score"] is not None
+
+# Parse one evaluation reply into {"score", "strengths", "improvements"}
+def parse_evaluation(text: str) -> dict:
+    evaluation = _parse_json(text)
+    if evaluation is not None:
+        return evaluation
+    # Not JSON: keep the prose and pick up an "x/10" rating if there is one
+    score = re.search(r"\b(10|\d)\s*/\s*10\b", text)
+    return {"score": int(score.group(1)) if score else None, "strengths": "", "improvements": text.strip()}
+
+# Get AI feedback on a single answer
+def evaluate_answer(question: str, answer: str) -> dict:
+    answer = answer.strip()
+    if not answer:
+        return EMPTY_ANSWER
+    key = cache.make_key(question, answer)
+    evaluation = _evaluations.get(key)
+    if evaluation is not None:
+        return evaluation
+
+    prompt = f"""You are a seasoned technical interviewer. Evaluate the candidate's answer to this interview question.
+
+Question: {question}
+Answer: {answer}
+
+Respond with JSON only, in this format:
+{{"score": <integer 0-10>, "strengths": "<what was good>", "improvements": "<what to improve>"}}
 """
-
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You are a helpful and objective interview evaluator."},
             {"role": "user", "content": prompt}
         ],
-        max_tokens=1000,
-        temperature=0.7,
+        max_tokens=300,
+        temperature=0.3,
+        cache_if=_usable,
     )
-    return response.choices[0].message.content.strip()
+    evaluation = parse_evaluation(response)
+    if _usable(response):
+        _evaluations.set(key, evaluation)
+    return evaluation
+
+# Evaluate every answer concurrently; yields (index, evaluation) as each one finishes
+def evaluate_answers(questions, answers):
+    pool = ThreadPoolExecutor(max_workers=EVAL_CONCURRENCY)
+    try:
+        futures = {pool.submit(evaluate_answer, q, a): i for i, (q, a) in enumerate(zip(questions, answers))}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], {"score": None, "strengths": "", "improvements": f"❌ Evaluation failed: {e}"}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# Render one question's feedback card
+def render_evaluation(i, question, evaluation):
+    score = evaluation["score"]
+    rating = f"{score}/10" if score is not None else "n/a"
+    st.markdown(f"**Question {i+1} Feedback (rating {rating})** — {question}")
+    if evaluation["strengths"]:
+        st.markdown(f"✅ {evaluation['strengths']}")
+    if evaluation["improvements"]:
+        st.markdown(f"🛠️ {evaluation['improvements']}")
+
+# Render the average rating
+def render_overall(evaluations):
+    scores = [e["score"] for e in evaluations if e and e["score"] is not None]
+    if scores:
+        st.metric("Overall rating", f"{sum(scores) / len(scores):.1f}/10")
 
 # Streamlit App Logic
 def run():
@@ -101,19 +150,25 @@ Let’s help you build interview confidence — one question at a time!
     st.markdown('<div class="left-box">', unsafe_allow_html=True)
 
     interview_type = st.radio("Choose your interview focus:", ["Technical", "Behavioral"], horizontal=True)
+    seen = st.session_state.setdefault("seen_questions", set())
+    question_bank.refill_async(interview_type, seen)  # warm the bank while the user reads
     if st.button("🎯 Generate Interview Questions"):
-        st.session_state.questions = generate_questions(interview_type)
+        with st.spinner("🎯 Preparing your questions..."):
+            questions = generate_questions(interview_type, seen)
+        seen.update(q.id for q in questions)
+        st.session_state.questions = [q.text for q in questions]
         st.session_state.start_time = datetime.datetime.now()
         st.session_state.feedback = None
 
     st.markdown('</div>', unsafe_allow_html=True)
 
     st.markdown('<div class="right-box">', unsafe_allow_html=True)
-    st_lottie(lottie_json, height=220, key="mock_lottie")
+    assets.show_lottie("animations/Animation - 1749286005992.json", height=220, key="mock_lottie")
     st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
     # Display questions & text areas
+    submitted = False
     if "questions" in st.session_state:
         st.subheader("📋 Your Mock Interview Questions")
         answers = []
@@ -123,17 +178,33 @@ Let’s help you build interview confidence — one question at a time!
 
         col1, col2 = st.columns([1, 2])
         with col1:
-            if st.button("📝 Submit Answers for Feedback"):
-                st.session_state.feedback = get_feedback(st.session_state.questions, answers)
+            submitted = st.button("📝 Submit Answers for Feedback")
         with col2:
             if "start_time" in st.session_state:
                 elapsed = datetime.datetime.now() - st.session_state.start_time
                 st.info(f"⏱️ Time Elapsed: {elapsed.seconds // 60} min {elapsed.seconds % 60} sec")
 
-    # Feedback section
-    if st.session_state.get("feedback"):
+    # Feedback section: one card per question, filled in as each evaluation finishes
+    if submitted:
+        st.markdown("### 🧠 Interview Feedback")
+        questions = st.session_state.questions
+        overall = st.empty()
+        slots = [st.empty() for _ in questions]
+        for slot in slots:
+            slot.info("⏳ Evaluating...")
+        evaluations = [None] * len(questions)
+        for i, evaluation in evaluate_answers(questions, answers):
+            evaluations[i] = evaluation
+            with slots[i].container():
+                render_evaluation(i, questions[i], evaluation)
+        with overall.container():
+            render_overall(evaluations)
+        st.session_state.feedback = evaluations
+    elif st.session_state.get("feedback"):
         st.markdown("### 🧠 Interview Feedback")
-        st.markdown(st.session_state.feedback)
+        render_overall(st.session_state.feedback)
+        for i, (question, evaluation) in enumerate(zip(st.session_state.questions, st.session_state.feedback)):
+            render_evaluation(i, question, evaluation)
 
 if __name__ == "__main__":
     run()
@@ -1,18 +1,451 @@
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
 import streamlit as st
-from openai import OpenAI
 
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["openai_key"])
+import cache
+import cassettes
+import metrics
+import prompt_budget
+import scheduler
+from singleflight import SingleFlight
 
-def ask_openai(messages):
+# --------------------------
+# Gateway settings
+# --------------------------
+DEFAULT_MODEL = "gpt-4"
+
+# One keep-alive pool shared by every page in the process
+MAX_CONNECTIONS = 50
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60.0  # seconds an idle connection stays open
+
+# Central timeouts (seconds)
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 90.0
+
+# Account limits the scheduler keeps within (override with OPENAI_RPM / OPENAI_TPM);
+# retries happen in the scheduler, so the client itself never retries
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 150_000
+TOKENS_PER_MESSAGE = 4  # chat formatting overhead per message
+
+# Completion cache size caps (per-call TTLs are chosen by each page)
+CACHE_MEMORY_ENTRIES = 256
+CACHE_DISK_ENTRIES = 5000
+
+
+def get_setting(name: str, default=None):
+    """Read a setting from Streamlit secrets, falling back to an environment variable."""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",  # Or "gpt-4" if available
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        pass  # no secrets.toml (e.g. CLI or tests)
+    return os.environ.get(name.upper(), default)
+
+
+@dataclass
+class Completion:
+    text: str
+    finish_reason: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+# --------------------------
+# Backends
+# --------------------------
+class Backend:
+    """Interface every completion backend implements."""
+
+    name = "base"
+
+    def complete(self, model: str, messages: list, max_tokens: int, temperature: float, **params) -> Completion:
+        raise NotImplementedError
+
+    def stream(self, model: str, messages: list, max_tokens: int, temperature: float, **params):
+        """Yield the reply as text deltas. Backends without native streaming yield it in one piece."""
+        yield self.complete(model, messages, max_tokens, temperature, **params).text
+
+    def retry_after(self, error: Exception) -> Optional[float]:
+        """Minimum seconds to wait before retrying ``error``, or ``None`` if it isn't transient."""
+        return None
+
+
+class OpenAIBackend(Backend):
+    name = "openai"
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        import httpx
+        from openai import OpenAI
+
+        timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+        http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+            timeout=timeout,
+            max_retries=0,
+        )
+
+    def complete(self, model, messages, max_tokens, temperature, **params):
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **params,
+        )
+        choice = response.choices[0]
+        usage = response.usage
+        return Completion(
+            text=choice.message.content or "",
+            finish_reason=choice.finish_reason,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+        )
+
+    def retry_after(self, error):
+        import openai
+
+        if isinstance(error, openai.RateLimitError):
+            try:
+                return float(error.response.headers.get("retry-after", 0))
+            except (TypeError, ValueError):
+                return 0.0
+        if isinstance(error, openai.APIStatusError):
+            return 0.0 if error.status_code >= 500 else None
+        if isinstance(error, openai.APIConnectionError):  # includes timeouts
+            return 0.0
+        return None
+
+    def stream(self, model, messages, max_tokens, temperature, **params):
+        response = self.client.chat.completions.create(
+            model=model,
             messages=messages,
-            max_tokens=500,
-            temperature=1.0,
-            top_p=1.0,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            **params,
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class StubBackend(Backend):
+    """Offline backend for local development: echoes the prompt without calling any API."""
+
+    name = "stub"
+
+    def __init__(self, reply: Optional[str] = None):
+        self.reply = reply
+
+    def complete(self, model, messages, max_tokens, temperature, **params):
+        prompt = messages[-1]["content"] if messages else ""
+        text = self.reply if self.reply is not None else f"*[{model} stub]* {prompt.strip()[:200]}"
+        return Completion(
+            text=text,
+            finish_reason="stop",
+            prompt_tokens=sum(len(m["content"].split()) for m in messages),
+            completion_tokens=len(text.split()),
         )
-        return response.choices[0].message.content
+
+    def stream(self, model, messages, max_tokens, temperature, **params):
+        text = self.complete(model, messages, max_tokens, temperature, **params).text
+        for i, word in enumerate(text.split(" ")):
+            yield word if i == 0 else " " + word
+
+
+BACKENDS = {
+    "openai": lambda: OpenAIBackend(get_setting("openai_key"), base_url=get_setting("openai_base_url")),
+    "stub": StubBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> Backend:
+    """Return the process-wide backend, creating it on first use.
+
+    With ``CASSETTE`` set, calls are recorded to (or replayed from) a cassette; see cassettes.py.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = get_setting("llm_backend", "openai")
+                if name not in BACKENDS:
+                    raise ValueError(f"Unknown LLM backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+                _backend = cassettes.wrap_backend(BACKENDS[name])
+    return _backend
+
+
+_scheduler = None
+
+
+def get_scheduler() -> scheduler.Scheduler:
+    """Return the process-wide request scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _backend_lock:
+            if _scheduler is None:
+                _scheduler = scheduler.Scheduler(
+                    float(get_setting("openai_rpm", REQUESTS_PER_MINUTE)),
+                    float(get_setting("openai_tpm", TOKENS_PER_MINUTE)),
+                )
+    return _scheduler
+
+
+def estimate_tokens(messages, max_tokens) -> int:
+    """Tokens a request can consume at most: its prompt plus the whole ``max_tokens``."""
+    prompt = sum(prompt_budget.count_tokens(m["content"]) + TOKENS_PER_MESSAGE for m in messages)
+    return prompt + max_tokens
+
+
+def _used_tokens(completion: Completion) -> Optional[int]:
+    if completion.prompt_tokens is None or completion.completion_tokens is None:
+        return None
+    return completion.prompt_tokens + completion.completion_tokens
+
+
+def _record(labels, seconds, completion: Completion):
+    metrics.inc("llm_requests_total", outcome="ok", **labels)
+    metrics.observe("llm_request_seconds", seconds, **labels)
+    if completion.prompt_tokens is not None:
+        metrics.inc("llm_tokens_total", completion.prompt_tokens, kind="prompt", **labels)
+    if completion.completion_tokens is not None:
+        metrics.inc("llm_tokens_total", completion.completion_tokens, kind="completion", **labels)
+    if completion.finish_reason:
+        metrics.inc("llm_finish_total", reason=completion.finish_reason, **labels)
+
+
+def set_backend(backend: Optional[Backend]):
+    """Swap the process-wide backend (``None`` re-reads the configuration on next call)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# --------------------------
+# Completion cache
+# --------------------------
+completion_cache = cache.TieredCache(
+    "completions",
+    memory_max_entries=CACHE_MEMORY_ENTRIES,
+    disk_max_entries=CACHE_DISK_ENTRIES,
+)
+
+
+def completion_key(backend_name, model, messages, max_tokens, temperature, **params) -> str:
+    return cache.make_key(backend_name, model, messages, temperature, max_tokens, params)
+
+
+# --------------------------
+# Request coalescing
+# --------------------------
+# Identical requests that arrive while one is already running (e.g. a class opening the same
+# page together) wait for that call instead of sending their own.
+_flights = SingleFlight()
+
+
+class SharedStream:
+    """One backend stream fanned out to every consumer that joins while it is running.
+
+    The stream is read on its own thread so it completes (and fills the cache) even if the
+    session that started it goes away; each consumer replays what it missed, then follows live.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._parts = []
+        self._finished = False
+        self._error = None
+
+    def publish(self, delta: str):
+        with self._cond:
+            self._parts.append(delta)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._cond:
+            self._finished = True
+            self._error = error
+            self._cond.notify_all()
+
+    def __iter__(self):
+        seen = 0
+        while True:
+            with self._cond:
+                while seen == len(self._parts) and not self._finished:
+                    self._cond.wait()
+                new = self._parts[seen:]
+                seen = len(self._parts)
+                finished, error = self._finished, self._error
+            yield from new
+            if finished:
+                if error is not None:
+                    raise error
+                return
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def _join_stream(key, labels, backend, model, messages, max_tokens, temperature, cache_ttl, cache_if, **params) -> SharedStream:
+    """The in-flight stream for ``key``, starting it if nobody else has."""
+    with _streams_lock:
+        shared = _streams.get(key)
+        if shared is not None:
+            return shared
+        shared = _streams[key] = SharedStream()
+    level = scheduler.current_priority()  # the reader thread doesn't inherit the caller's context
+
+    def produce():
+        error = None
+        started = time.monotonic()
+        try:
+            parts = []
+
+            # Streams carry no usage, so tokens are counted locally
+            def counted() -> Completion:
+                text = "".join(parts)
+                return Completion(text, prompt_tokens=estimate_tokens(messages, 0),
+                                  completion_tokens=prompt_budget.count_tokens(text))
+
+            deltas = get_scheduler().stream(
+                lambda: backend.stream(model, messages, max_tokens, temperature, **params),
+                estimate_tokens(messages, max_tokens),
+                level,
+                retry_after=backend.retry_after,
+                used=lambda: _used_tokens(counted()),
+            )
+            for delta in deltas:
+                parts.append(delta)
+                shared.publish(delta)
+            completion = counted()
+            if _cacheable(completion.text, cache_ttl, cache_if):
+                completion_cache.set(key, completion.text, ttl=cache_ttl)
+            _record(labels, time.monotonic() - started, completion)
+        except Exception as e:
+            error = e
+            metrics.inc("llm_requests_total", outcome="error", **labels)
+        finally:
+            with _streams_lock:
+                del _streams[key]
+            shared.finish(error)
+
+    threading.Thread(target=produce, name="llm-stream", daemon=True).start()
+    return shared
+
+
+_refresh = contextvars.ContextVar("llm_refresh", default=False)
+
+
+@contextlib.contextmanager
+def refresh():
+    """Ignore cached replies for ``chat`` calls in this block (on this thread); new ones are still cached."""
+    token = _refresh.set(True)
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
+
+
+def _cacheable(text, cache_ttl, cache_if) -> bool:
+    return bool(cache_ttl and text and (cache_if is None or cache_if(text)))
+
+
+# --------------------------
+# Public API used by the pages
+# --------------------------
+def chat(messages, model=DEFAULT_MODEL, max_tokens=1000, temperature=0.7, cache_ttl=None, stream=False,
+         cache_if=None, **params):
+    """Send a chat completion through the shared backend and return the reply text.
+
+    With ``stream=True`` an iterator over text deltas is returned instead; it can be passed
+    straight to ``st.write_stream``. With ``cache_ttl`` (seconds), identical requests are
+    answered from the completion cache (bypassed while a cassette records or replays, and read
+    past inside ``refresh()``);
+    ``cache_if(text)`` can veto caching a reply the caller can't use (malformed JSON, say), so
+    the next request asks again. Identical requests made while one is in flight share its reply
+    (or its stream) rather than calling the API again. Every request is admitted by the
+    process-wide scheduler, which keeps within the account's rate limits and retries throttled
+    or failed calls.
+    """
+    labels = {**metrics.caller(), "model": model}
+    if cassettes.mode():
+        # A recording must capture warm-cache prompts too, and a replay must keep its recorded timing
+        cache_ttl = None
+    use_cached = bool(cache_ttl) and not _refresh.get()
+    if stream:
+        return _stream_chat(messages, model, max_tokens, temperature, cache_ttl, cache_if, use_cached, labels, **params)
+    backend = get_backend()
+    key = completion_key(backend.name, model, messages, max_tokens, temperature, **params)
+    if use_cached:
+        cached = completion_cache.get(key)
+        if cached is not None:
+            metrics.inc("llm_requests_total", outcome="cached", **labels)
+            return cached
+
+    def complete():
+        started = time.monotonic()
+        try:
+            completion = get_scheduler().call(
+                lambda: backend.complete(model, messages, max_tokens, temperature, **params),
+                estimate_tokens(messages, max_tokens),
+                retry_after=backend.retry_after,
+                used=_used_tokens,
+            )
+        except Exception:
+            metrics.inc("llm_requests_total", outcome="error", **labels)
+            raise
+        _record(labels, time.monotonic() - started, completion)
+        text = completion.text
+        # Cache before the flight ends so requests arriving right after find it
+        if _cacheable(text, cache_ttl, cache_if):
+            completion_cache.set(key, text, ttl=cache_ttl)
+        return text
+
+    return _flights.do(key, complete)
+
+
+def _stream_chat(messages, model, max_tokens, temperature, cache_ttl, cache_if, use_cached, labels, **params):
+    backend = get_backend()
+    key = completion_key(backend.name, model, messages, max_tokens, temperature, **params)
+    if use_cached:
+        cached = completion_cache.get(key)
+        if cached is not None:
+            metrics.inc("llm_requests_total", outcome="cached", **labels)
+            yield cached
+            return
+    yield from _join_stream(key, labels, backend, model, messages, max_tokens, temperature, cache_ttl, cache_if, **params)
+
+
+def in_flight() -> int:
+    """Distinct completion requests currently running (shared calls count once)."""
+    with _streams_lock:
+        return _flights.in_flight() + len(_streams)
+
+
+def ask_openai(messages):
+    try:
+        return chat(messages, max_tokens=500, temperature=1.0, top_p=1.0)
     except Exception as e:
         return f"❌ Error: {e}"
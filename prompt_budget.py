@@ -0,0 +1,184 @@
+import math
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import scheduler
+
+# --------------------------
+# Prompt budgets (tokens)
+# --------------------------
+RESUME_BUDGET = 1500
+JOB_DESC_BUDGET = 1000
+CHUNK_TOKENS = 1200  # map step input size
+SUMMARY_TOKENS = 250  # map step output cap
+MAX_REDUCE_ROUNDS = 2
+MAP_CONCURRENCY = 4
+SUMMARY_MODEL = "gpt-3.5-turbo"
+CHARS_PER_TOKEN = 4  # fallback estimate when tiktoken is not installed
+
+HEADER_FOOTER_LINES = 3  # lines at the top/bottom of each page checked for repeats
+PAGE_NUMBER = re.compile(r"^(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?$", re.I)
+
+# Chunk summaries can contain resume content, so they stay in process memory only
+_summaries = cache.LRUCache(max_entries=512)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+# --------------------------
+# Token counting
+# --------------------------
+def _get_encoding():
+    """tiktoken's cl100k encoding when available, otherwise ``False``."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:  # not installed, or the encoding file can't be fetched
+                    _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[: max_tokens * CHARS_PER_TOKEN]
+
+
+# --------------------------
+# Text cleanup
+# --------------------------
+def normalize_text(text: str) -> str:
+    """Collapse whitespace runs and blank lines, and drop immediately repeated lines."""
+    lines, previous = [], None
+    for line in text.splitlines():
+        line = re.sub(r"[ \t\u00a0]+", " ", line).strip()
+        if line == previous and line:
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+        previous = line
+    return "\n".join(lines).strip()
+
+
+def _line_signature(line: str) -> str:
+    line = re.sub(r"\s+", " ", line).strip().lower()
+    # "Page 2 of 5" and "Page 3 of 5" count as the same footer
+    return "<page number>" if PAGE_NUMBER.match(line) else line
+
+
+def _edges(lines):
+    """``(position, signature)`` for the first/last lines of a page (positions from the bottom are negative)."""
+    if len(lines) <= 2 * HEADER_FOOTER_LINES:
+        return {}  # too short to tell a header from content
+    top = {k: lines[k] for k in range(HEADER_FOOTER_LINES)}
+    bottom = {-(k + 1): lines[-(k + 1)] for k in range(HEADER_FOOTER_LINES)}
+    return {pos: _line_signature(line) for pos, line in {**top, **bottom}.items()}
+
+
+def strip_repeated_lines(pages) -> str:
+    """Join page texts, removing header/footer lines that repeat in the same spot on most pages."""
+    if len(pages) < 2:
+        return normalize_text("".join(pages))
+    page_lines = [[l for l in page.splitlines() if l.strip()] for page in pages]
+    page_edges = [_edges(lines) for lines in page_lines]
+    counts = Counter(item for edges in page_edges for item in edges.items())
+    threshold = max(2, math.ceil(len(pages) / 2))
+
+    kept = []
+    for lines, edges in zip(page_lines, page_edges):
+        drop = {pos % len(lines) for pos, sig in edges.items() if counts[(pos, sig)] >= threshold}
+        kept.extend(l for i, l in enumerate(lines) if i not in drop)
+    return normalize_text("\n".join(kept))
+
+
+def clean_document(document) -> str:
+    """Prompt-ready text for an ``ingestion.Document``."""
+    return strip_repeated_lines(document.pages) if document.pages else normalize_text(document.text)
+
+
+# --------------------------
+# Map-reduce for oversized inputs
+# --------------------------
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS) -> list:
+    """Split on line boundaries into chunks of at most ``max_tokens`` each."""
+    step = (max_tokens - 1) * CHARS_PER_TOKEN // 2  # conservative split for very long lines
+    lines = []
+    for line in text.splitlines():
+        lines.extend([line] if count_tokens(line) < max_tokens else [line[i:i + step] for i in range(0, len(line), step)])
+
+    chunks, current, size = [], [], 0
+    for line in lines:
+        n = count_tokens(line) + 1
+        if current and size + n > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += n
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _summarize_chunk(chunk: str, purpose: str) -> str:
+    import openai_api
+
+    key = cache.make_key(purpose, chunk)
+    summary = _summaries.get(key)
+    if summary is None:
+        summary = openai_api.chat(
+            messages=[
+                {"role": "system", "content": "You condense documents without losing facts."},
+                {"role": "user", "content": f"""Condense this part of a {purpose} into concise bullet points.
+Keep every skill, tool, job title, employer, date, degree, certification, number and requirement.
+Drop boilerplate, repetition and formatting noise.
+
+\"\"\"{chunk}\"\"\""""},
+            ],
+            model=SUMMARY_MODEL,
+            max_tokens=SUMMARY_TOKENS,
+            temperature=0,
+        ).strip()
+        _summaries.set(key, summary)
+    return summary
+
+
+def fit(text: str, budget: int, purpose: str = "document") -> str:
+    """Return ``text`` cleaned up and, if still over ``budget`` tokens, map-reduce summarized.
+
+    Chunks are summarized concurrently; summaries are merged and re-summarized until they fit,
+    and anything still over budget after ``MAX_REDUCE_ROUNDS`` is truncated.
+    """
+    text = normalize_text(text)
+    for _ in range(MAX_REDUCE_ROUNDS):
+        if count_tokens(text) <= budget:
+            return text
+        chunks = chunk_text(text)
+        level = scheduler.current_priority()  # pool threads would otherwise default to interactive
+
+        def summarize(chunk):
+            with scheduler.priority(level):
+                return _summarize_chunk(chunk, purpose)
+
+        with ThreadPoolExecutor(max_workers=min(MAP_CONCURRENCY, len(chunks))) as pool:
+            summaries = list(pool.map(summarize, chunks))
+        text = normalize_text("\n".join(summaries))
+    return truncate_tokens(text, budget)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import cache
+import openai_api
+import scheduler
+
+# --------------------------
+# Bank settings
+# --------------------------
+QUESTION_DB = os.path.join(cache.CACHE_DIR, "questions.sqlite3")
+QUESTIONS_PER_SET = 10
+LOW_WATER = 40  # refill in the background when a session has fewer unseen questions than this
+HIGH_WATER = 80  # ...and stop once it has this many
+MAX_BANK_SIZE = 1000  # per interview type
+MAX_REFILL_BATCHES = 8  # per refill run, so a model that keeps repeating itself can't loop forever
+GENERATION_TEMPERATURE = 0.8
+
+# --------------------------
+# Near-duplicate detection (MinHash over word shingles)
+# --------------------------
+SHINGLE_SIZE = 3
+NUM_HASHES = 64
+DUPLICATE_THRESHOLD = 0.5  # estimated Jaccard similarity at or above which two questions are the same
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1749286005)
+_HASH_PARAMS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME)) for _ in range(NUM_HASHES)]
+
+
+def shingles(text: str) -> set:
+    words = re.findall(r"[a-z0-9+#]+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> list:
+    values = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles(text)]
+    return [min((a * v + b) % _MERSENNE_PRIME for v in values) for a, b in _HASH_PARAMS]
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_HASHES
+
+
+@dataclass(frozen=True)
+class Question:
+    id: int
+    text: str
+
+
+# --------------------------
+# Local store
+# --------------------------
+class QuestionBank:
+    """Interview questions per type, persisted in SQLite and kept free of near-duplicates."""
+
+    def __init__(self, path=QUESTION_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._signatures = {}  # interview type -> {question id: signature}
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS questions (
+                       id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       interview_type TEXT NOT NULL,
+                       text TEXT NOT NULL,
+                       signature TEXT NOT NULL,
+                       created_at REAL NOT NULL
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS questions_type ON questions (interview_type)")
+            self._conn = conn
+        return self._conn
+
+    def _load(self, interview_type) -> dict:
+        """Signatures for one type, read from disk once per process (caller holds the lock)."""
+        if interview_type not in self._signatures:
+            rows = self._connect().execute(
+                "SELECT id, signature FROM questions WHERE interview_type = ?", (interview_type,)
+            ).fetchall()
+            self._signatures[interview_type] = {qid: json.loads(sig) for qid, sig in rows}
+        return self._signatures[interview_type]
+
+    def count(self, interview_type, exclude=()) -> int:
+        with self._lock:
+            known = self._load(interview_type)
+            return len(known) - len(set(exclude) & known.keys())
+
+    def add(self, interview_type, texts) -> int:
+        """Store the questions that aren't near-duplicates of the bank or each other; return how many."""
+        added = 0
+        with self._lock:
+            known = self._load(interview_type)
+            conn = self._connect()
+            for text in texts:
+                if len(known) >= MAX_BANK_SIZE:
+                    break
+                signature = minhash(text)
+                if any(similarity(signature, other) >= DUPLICATE_THRESHOLD for other in known.values()):
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO questions (interview_type, text, signature, created_at) VALUES (?, ?, ?, ?)",
+                    (interview_type, text, json.dumps(signature), time.time()),
+                )
+                known[cursor.lastrowid] = signature
+                added += 1
+            conn.commit()
+        return added
+
+    def draw(self, interview_type, n=QUESTIONS_PER_SET, exclude=()) -> list:
+        """Random sample of up to ``n`` questions whose ids are not in ``exclude``."""
+        with self._lock:
+            exclude = set(exclude)
+            candidates = [qid for qid in self._load(interview_type) if qid not in exclude]
+            chosen = random.sample(candidates, min(n, len(candidates)))
+            if not chosen:
+                return []
+            rows = self._connect().execute(
+                f"SELECT id, text FROM questions WHERE id IN ({','.join('?' * len(chosen))})", chosen
+            ).fetchall()
+        texts = dict(rows)
+        return [Question(qid, texts[qid]) for qid in chosen]
+
+
+# --------------------------
+# Generation and refill
+# --------------------------
+def generate_batch(interview_type: str) -> list:
+    """Ask the model for a fresh numbered list of questions (never cached)."""
+    prompt = f"""You are an HR professional. Generate exactly ten {interview_type.lower()} interview questions suitable for final-year computer science/IT engineering students. Return them as a numbered list. Make the questions unique each time."""
+
+    response = openai_api.chat(
+        messages=[
+            {"role": "system", "content": "You are a professional interviewer."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=600,
+        temperature=GENERATION_TEMPERATURE,
+    )
+    lines = [re.sub(r"^\s*\d+[.)]\s*", "", q).strip() for q in response.strip().splitlines()]
+    return [q for q in lines if len(q) > 10]
+
+
+def refill(interview_type, bank=None, exclude=(), target=HIGH_WATER):
+    """Generate batches until ``target`` questions outside ``exclude`` are banked."""
+    bank = bank or get_bank()
+    for _ in range(MAX_REFILL_BATCHES):
+        if bank.count(interview_type, exclude) >= target:
+            return
+        bank.add(interview_type, generate_batch(interview_type))
+
+
+_refilling = set()
+_refill_lock = threading.Lock()
+
+
+def refill_async(interview_type, exclude=()):
+    """Top the bank up on a daemon thread when stock runs low (at most one refill per type)."""
+    bank = get_bank()
+    exclude = frozenset(exclude)  # the caller's set may keep changing while the worker runs
+    if bank.count(interview_type, exclude) >= LOW_WATER:
+        return
+    with _refill_lock:
+        if interview_type in _refilling:
+            return
+        _refilling.add(interview_type)
+
+    def worker():
+        try:
+            with scheduler.priority(scheduler.BATCH):  # nobody is waiting on a background refill
+                refill(interview_type, bank, exclude)
+        except Exception:
+            pass  # best effort; the next draw will try again
+        finally:
+            with _refill_lock:
+                _refilling.discard(interview_type)
+
+    threading.Thread(target=worker, name=f"question-refill-{interview_type}", daemon=True).start()
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_bank() -> QuestionBank:
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank()
+    return _bank
+
+
+def draw_questions(interview_type, n=QUESTIONS_PER_SET, exclude=()) -> list:
+    """Questions the caller hasn't seen, from the bank when it has stock.
+
+    Only a cold or exhausted bank generates synchronously, and then just one batch (which may
+    leave the set short); the background refill tops the bank up so the next draw is instant.
+    """
+    bank = get_bank()
+    if bank.count(interview_type, exclude) < n:
+        bank.add(interview_type, generate_batch(interview_type))
+    questions = bank.draw(interview_type, n, exclude)
+    refill_async(interview_type, set(exclude) | {q.id for q in questions})
+    return questions
@@ -0,0 +1,287 @@
+"""Precomputed regional reports for the map pages, indexed by geohash.
+
+Usage:
+    python regional_store.py                          # generate missing/stale reports for data/regions.json
+    python regional_store.py --kind industry_trends   # one report type only
+    python regional_store.py --regions my.json --force --concurrency 8
+    OPENAI_RPM=100 OPENAI_TPM=30000 python regional_store.py   # leave the rest of the limits to a running app
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import cache
+import metrics
+import scheduler
+
+# --------------------------
+# Store settings
+# --------------------------
+REGIONAL_DB = os.environ.get("REGIONAL_DB", os.path.join(cache.CACHE_DIR, "regional.sqlite3"))
+REGIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "regions.json")
+GEOHASH_PRECISION = 6  # stored cell (~1.2 km)
+SEARCH_PRECISION = 3  # lookup cells (~156 km), checked together with their 8 neighbours
+LOOKUP_RADIUS_KM = 50
+MAX_REPORT_AGE = 30 * 24 * 60 * 60  # older reports are ignored and regenerated by the next run
+EARTH_RADIUS_KM = 6371.0
+
+# Report kinds and the page function that generates each one
+KINDS = {
+    "global_insights": ("global_insights", "get_global_insights"),
+    "industry_trends": ("industry_trends", "get_industry_trends"),
+}
+
+# --------------------------
+# Geohash
+# --------------------------
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat, lon, precision=GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def _cell_size(precision):
+    """``(lat degrees, lon degrees)`` covered by one cell at ``precision``."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def geohash_cells(lat, lon, precision=SEARCH_PRECISION) -> set:
+    """The cell containing the point plus its 8 neighbours (wrapping at the antimeridian)."""
+    dlat, dlon = _cell_size(precision)
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            nlat = max(-89.999999, min(89.999999, lat + i * dlat))
+            nlon = (lon + j * dlon + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(nlat, nlon, precision))
+    return cells
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# --------------------------
+# Store
+# --------------------------
+@dataclass
+class RegionalReport:
+    kind: str
+    name: str
+    lat: float
+    lon: float
+    report: str
+    generated_at: float
+    distance_km: float = 0.0
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.generated_at
+
+    @property
+    def generated(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.generated_at)
+
+    def describe(self) -> str:
+        where = self.name if self.distance_km < 1 else f"{self.name} ({self.distance_km:.0f} km away)"
+        return f"Precomputed report for {where}, generated {format_age(self.age_seconds)}"
+
+
+def format_age(seconds) -> str:
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            n = int(seconds // size)
+            return f"{n} {unit}{'s' if n != 1 else ''} ago"
+    return "just now"
+
+
+class RegionalStore:
+    def __init__(self, path=REGIONAL_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS reports (
+                       kind TEXT NOT NULL,
+                       geohash TEXT NOT NULL,
+                       name TEXT NOT NULL,
+                       lat REAL NOT NULL,
+                       lon REAL NOT NULL,
+                       report TEXT NOT NULL,
+                       generated_at REAL NOT NULL,
+                       PRIMARY KEY (kind, geohash, name)
+                   )"""
+            )
+            self._conn = conn
+        return self._conn
+
+    def put(self, kind, name, lat, lon, report, generated_at=None):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO reports (kind, geohash, name, lat, lon, report, generated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, geohash_encode(lat, lon), name, lat, lon, report, generated_at or time.time()),
+            )
+            conn.commit()
+
+    def get(self, kind, name, lat, lon, max_age=MAX_REPORT_AGE):
+        """The report stored for exactly this region, if it is fresh enough."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT report, generated_at FROM reports WHERE kind = ? AND geohash = ? AND name = ? AND generated_at >= ?",
+                (kind, geohash_encode(lat, lon), name, time.time() - max_age),
+            ).fetchone()
+        return RegionalReport(kind, name, lat, lon, row[0], row[1]) if row else None
+
+    def nearest(self, kind, lat, lon, radius_km=LOOKUP_RADIUS_KM, max_age=MAX_REPORT_AGE):
+        """Closest fresh report within ``radius_km`` of the point, or ``None``."""
+        cells = sorted(geohash_cells(lat, lon))
+        # Each prefix range is an index seek on the primary key
+        clauses = " OR ".join("(geohash >= ? AND geohash < ?)" for _ in cells)
+        params = [kind, time.time() - max_age]
+        for cell in cells:
+            params += [cell, cell + "~"]
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT name, lat, lon, report, generated_at FROM reports WHERE kind = ? AND generated_at >= ? AND ({clauses})",
+                params,
+            ).fetchall()
+        best = None
+        for name, rlat, rlon, report, generated_at in rows:
+            distance = haversine_km(lat, lon, rlat, rlon)
+            if distance <= radius_km and (best is None or distance < best.distance_km):
+                best = RegionalReport(kind, name, rlat, rlon, report, generated_at, distance)
+        return best
+
+    def count(self, kind=None) -> int:
+        with self._lock:
+            conn = self._connect()
+            if kind:
+                return conn.execute("SELECT COUNT(*) FROM reports WHERE kind = ?", (kind,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RegionalStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RegionalStore()
+    return _store
+
+
+def lookup(kind, lat, lon, radius_km=LOOKUP_RADIUS_KM):
+    """Nearest precomputed report for a map page; store errors count as a miss."""
+    try:
+        return get_store().nearest(kind, lat, lon, radius_km)
+    except sqlite3.Error:
+        return None
+
+
+# --------------------------
+# Precompute job
+# --------------------------
+def load_regions(path=REGIONS_PATH) -> list:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _generate(kind, region, force=False):
+    import importlib
+
+    import openai_api
+
+    module_name, function_name = KINDS[kind]
+    generate = getattr(importlib.import_module(module_name), function_name)
+    # Forced reports are generated anew, not copied out of the completion cache with a new date
+    with scheduler.priority(scheduler.BATCH), openai_api.refresh() if force else contextlib.nullcontext():
+        return generate(region["lat"], region["lon"], region["name"])
+
+
+def precompute(regions, kinds=tuple(KINDS), store=None, concurrency=4, force=False, progress=None):
+    """Generate and store a report per (kind, region); with ``force``, fresh stored reports and
+    cached completions are both regenerated."""
+    store = store or get_store()
+    jobs = [(kind, region) for kind in kinds for region in regions
+            if force or store.get(kind, region["name"], region["lat"], region["lon"]) is None]
+    done, failures = 0, []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(_generate, kind, region, force): (kind, region) for kind, region in jobs}
+        for future in as_completed(futures):
+            kind, region = futures[future]
+            try:
+                report = future.result()
+                if report:
+                    store.put(kind, region["name"], region["lat"], region["lon"], report)
+            except Exception as e:
+                failures.append((kind, region["name"], str(e)))
+            done += 1
+            if progress:
+                progress(done, len(jobs))
+    return len(jobs), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate regional reports for the map pages.")
+    parser.add_argument("--regions", default=REGIONS_PATH, help="JSON list of {name, lat, lon}")
+    parser.add_argument("--kind", choices=sorted(KINDS), action="append", help="report type (default: all)")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM requests in flight")
+    parser.add_argument("--force", action="store_true", help="regenerate reports that are still fresh")
+    args = parser.parse_args(argv)
+    metrics.start()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} reports", end="", file=sys.stderr, flush=True)
+
+    total, failures = precompute(load_regions(args.regions), args.kind or tuple(KINDS),
+                                 concurrency=args.concurrency, force=args.force, progress=progress)
+    print(file=sys.stderr)
+    for kind, name, error in failures:
+        print(f"failed: {kind} / {name}: {error}", file=sys.stderr)
+    print(f"Generated {total - len(failures)} of {total} reports into {REGIONAL_DB}")
+
+
+if __name__ == "__main__":
+    main()
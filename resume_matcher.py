@@ -1,57 +1,77 @@
 import streamlit as st
-from openai import OpenAI
-import fitz  # PyMuPDF
-
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# Set Streamlit page configuration
-st.set_page_config(page_title="Resume Matcher", page_icon="🧾")
-
-# --------------------------
-# Function: Extract text from uploaded PDF resume
-# --------------------------
-def extract_text_from_pdf(uploaded_file):
-    with fitz.open(stream=uploaded_file.read(), filetype="pdf") as doc:
-        text = ""
-        for page in doc:
-            text += page.get_text()
-    return text
+import openai_api
+import ingestion
+import prompt_budget
+import resume_profile
+import skill_matcher
 
 # --------------------------
 # Function: Match Resume with Job Description
 # --------------------------
-def match_resume_to_job(resume_text, job_desc):
-    prompt = f"""
-You are a professional job-matching assistant.
+def match_resume_to_job(resume_text, job_desc, skill_match=None, stream=False):
+    # Long resumes/JDs are condensed so the prompt stays within a fixed token budget
+    resume_text = prompt_budget.fit(resume_text, prompt_budget.RESUME_BUDGET, purpose="resume")
+    job_desc = prompt_budget.fit(job_desc, prompt_budget.JOB_DESC_BUDGET, purpose="job description")
 
-Compare the following resume with the job description. Perform:
+    if skill_match is None:
+        task = """Compare the following resume with the job description. Perform:
 - A percentage match (0-100%)
 - List of matched skills
 - List of missing skills
-- Areas of improvement for the candidate
+- Areas of improvement for the candidate"""
+    else:
+        # The score and skill lists come from skill_matcher; the model only writes the advice
+        task = f"""A skill scan has already compared this resume with the job description:
+- Skill match: {skill_match.score if skill_match.score is not None else "n/a"}%
+- Matched skills: {", ".join(skill_match.matched) or "none"}
+- Missing skills: {", ".join(skill_match.missing) or "none"}
+
+Do not recompute the match or repeat these lists. Give specific, actionable areas of improvement
+for the candidate: how to close the missing skills and how to present existing experience better."""
 
-Resume:
+    prompt = f"""
+You are a professional job-matching assistant.
+
+{task}
+
+Resume (condensed profile):
 \"\"\"{resume_text}\"\"\"
 
 Job Description:
 \"\"\"{job_desc}\"\"\"
 """
-    response = client.chat.completions.create(
-        model="gpt-4",  # or "gpt-3.5-turbo"
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You are a job-matching assistant."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.7,
+        stream=stream,
     )
-    return response.choices[0].message.content
+    return response
+
+# --------------------------
+# Function: Show the local skill-match result
+# --------------------------
+def render_skill_match(match):
+    if match.score is None:
+        st.info("ℹ️ No known skills were found in the job description, so no match score could be computed.")
+        return
+    st.metric("Skill match", f"{match.score}%")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**✅ Matched skills**")
+        st.markdown("\n".join(f"- {s}" for s in match.matched) or "_None_")
+    with col2:
+        st.markdown("**❌ Missing skills**")
+        st.markdown("\n".join(f"- {s}" for s in match.missing) or "_None_")
 
 # --------------------------
 # Streamlit App UI
 # --------------------------
 def run():
+    st.set_page_config(page_title="Resume Matcher", page_icon="🧾")
     st.title("🧾 Resume Matcher & Skill Analyzer")
 
     # 📘 App Description
@@ -74,23 +94,37 @@ def run():
     uploaded_resume = st.file_uploader("📄 Upload your resume (PDF only)", type=["pdf"])
     job_desc = st.text_area("📝 Paste the Job Description Here:")
 
+    # Extraction is cached by file hash, so reruns (e.g. typing in the JD box) are free
     resume_text = ""
+    document = None
     if uploaded_resume:
         with st.spinner("⏳ Extracting text from resume..."):
-            resume_text = extract_text_from_pdf(uploaded_resume)
-            st.success("✅ Resume text extracted.")
+            try:
+                # Compact profile parsed once per upload; sent instead of the full resume text
+                document = ingestion.ingest_upload(uploaded_resume)
+                resume_text = resume_profile.build_profile(document).to_prompt()
+                st.success("✅ Resume text extracted.")
+            except ingestion.DocumentError as e:
+                st.error(f"❌ {e}")
+
+    get_advice = st.checkbox("🧠 Also get AI improvement advice (takes a few seconds)", value=True)
 
     if st.button("🔍 Match Resume"):
         if not resume_text or not job_desc:
             st.warning("⚠️ Please upload a resume and paste the job description.")
             return
-        with st.spinner("🧠 Analyzing..."):
-            try:
-                result = match_resume_to_job(resume_text, job_desc)
-                st.markdown("### 📊 Match Report")
-                st.markdown(result)
-            except Exception as e:
-                st.error(f"❌ Error: {e}")
+        # Instant, deterministic score from the full resume text
+        st.markdown("### 📊 Match Report")
+        match = skill_matcher.match_skills(document.text, job_desc)
+        render_skill_match(match)
+
+        if get_advice:
+            st.markdown("### 🛠️ Areas of Improvement")
+            with st.spinner("🧠 Analyzing..."):
+                try:
+                    st.write_stream(match_resume_to_job(resume_text, job_desc, skill_match=match, stream=True))
+                except Exception as e:
+                    st.error(f"❌ Error: {e}")
 
 # Run the app
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+import datetime
+import re
+from dataclasses import dataclass, field
+
+import cache
+import prompt_budget
+import skill_matcher
+
+# --------------------------
+# Resume section headings
+# --------------------------
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "profile", "about me", "objective", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history", "internships", "internship"],
+    "education": ["education", "academic background", "academics", "qualifications", "educational qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies", "tech stack", "tools"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "courses", "licenses", "licenses & certifications"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments"],
+}
+HEADING_TO_SECTION = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+TITLE_WORDS = re.compile(
+    r"\b(engineer|developer|intern|manager|analyst|scientist|consultant|designer|architect|"
+    r"lead|specialist|administrator|researcher|associate|director|officer|programmer|tester)\b",
+    re.I,
+)
+DEGREE_WORDS = re.compile(
+    r"\b(b\.?\s?tech|m\.?\s?tech|b\.?e\.?|m\.?e\.?|b\.?sc|m\.?sc|b\.?s\.?|m\.?s\.?|bca|mca|mba|ph\.?d|"
+    r"bachelor|master|diploma|degree|university|college|institute)\b",
+    re.I,
+)
+MONTHS = {m: i + 1 for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+DATE = r"(?:(?P<{0}m>[A-Za-z]{{3,9}}\.?|\d{{1,2}})[\s/.-]*)?(?P<{0}y>(?:19|20)\d{{2}})"
+DATE_RANGE = re.compile(
+    DATE.format("s") + r"\s*(?:-|–|—|to)\s*(?:" + DATE.format("e") + r"|(?P<present>present|current|now|till date))",
+    re.I,
+)
+BULLET = re.compile(r"^\s*(?:[•●▪◦\-*–]|\d+[.)])\s*")
+
+MAX_SKILLS = 40
+MAX_TITLES = 6
+MAX_EDUCATION = 4
+MAX_HIGHLIGHTS = 12
+MAX_LINE = 160
+
+# Profiles are derived data keyed by the upload hash; kept in memory only
+_profiles = cache.LRUCache(max_entries=256)
+
+
+@dataclass
+class ResumeProfile:
+    summary: str = ""
+    titles: list = field(default_factory=list)
+    years_experience: float = None
+    skills: list = field(default_factory=list)
+    education: list = field(default_factory=list)
+    certifications: list = field(default_factory=list)
+    highlights: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+    raw_text: str = ""
+
+    @property
+    def is_sparse(self) -> bool:
+        """True when too little structure was found to stand in for the raw resume."""
+        return len(self.sections) < 2 or not (self.skills or self.highlights)
+
+    def to_prompt(self) -> str:
+        """Compact plain-text rendering fed to the LLM instead of the full resume."""
+        if self.is_sparse:
+            return self.raw_text.strip()
+        lines = []
+        if self.summary:
+            lines.append(f"Summary: {self.summary}")
+        if self.titles:
+            lines.append(f"Roles held: {'; '.join(self.titles)}")
+        if self.years_experience is not None:
+            lines.append(f"Experience: about {self.years_experience:g} years")
+        if self.skills:
+            lines.append(f"Skills: {', '.join(self.skills)}")
+        if self.education:
+            lines.append(f"Education: {'; '.join(self.education)}")
+        if self.certifications:
+            lines.append(f"Certifications: {'; '.join(self.certifications)}")
+        if self.highlights:
+            lines.append("Highlights:")
+            lines.extend(f"- {h}" for h in self.highlights)
+        return "\n".join(lines)
+
+
+# --------------------------
+# Parsing helpers
+# --------------------------
+def _clean(line: str) -> str:
+    line = re.sub(r"\s+", " ", BULLET.sub("", line)).strip(" :|,;")
+    return line if len(line) <= MAX_LINE else line[: MAX_LINE - 1].rstrip() + "…"
+
+
+def _heading(line: str):
+    key = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+    return HEADING_TO_SECTION.get(key) if len(key.split()) <= 4 else None
+
+
+def split_sections(text: str) -> dict:
+    """Group resume lines under the section heading they follow (``header`` for the top)."""
+    sections = {"header": []}
+    current = "header"
+    pending_bullet = False
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        # PDF extraction often puts a bullet glyph on its own line; glue it to the next one
+        if BULLET.sub("", line).strip() == "":
+            pending_bullet = True
+            continue
+        if pending_bullet:
+            line, pending_bullet = "• " + line.strip(), False
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        else:
+            sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _dedupe(items, limit):
+    seen, result = set(), []
+    for item in items:
+        key = item.lower()
+        if item and key not in seen:
+            seen.add(key)
+            result.append(item)
+        if len(result) >= limit:
+            break
+    return result
+
+
+def extract_skills(lines) -> list:
+    items = []
+    for line in lines:
+        line = re.sub(r"^[^:]{1,30}:\s*", "", BULLET.sub("", line))  # drop "Languages:" style labels
+        items.extend(_clean(part) for part in re.split(r"[,|•·;/]|\s{2,}", line))
+    return _dedupe([s for s in items if 1 < len(s) <= 40], MAX_SKILLS)
+
+
+def _month_index(month, year):
+    month_num = 1
+    if month:
+        month = month.rstrip(".").lower()
+        month_num = int(month) if month.isdigit() else MONTHS.get(month[:3], 1)
+    return int(year) * 12 + min(max(month_num, 1), 12) - 1
+
+
+def estimate_years(lines, today=None):
+    """Total years covered by the date ranges in ``lines`` (overlaps counted once)."""
+    today = today or datetime.date.today()
+    spans = []
+    for match in DATE_RANGE.finditer("\n".join(lines)):
+        start = _month_index(match["sm"], match["sy"])
+        if match["present"]:
+            end = today.year * 12 + today.month - 1
+        else:
+            end = _month_index(match["em"], match["ey"])
+        if end >= start:
+            spans.append((start, end + 1))
+    if not spans:
+        return None
+    months, current_start, current_end = 0, None, None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    months += current_end - current_start
+    return round(months / 12, 1)
+
+
+def extract_highlights(lines) -> list:
+    bullets = [_clean(l) for l in lines if BULLET.match(l)]
+    if not bullets:
+        # Paragraph-style resumes: keep the descriptive lines, not the title/date lines
+        bullets = [_clean(l) for l in lines if len(l.strip()) > 40 and not DATE_RANGE.search(l)]
+    return _dedupe(bullets, MAX_HIGHLIGHTS)
+
+
+# --------------------------
+# Public API
+# --------------------------
+def parse_profile(text: str) -> ResumeProfile:
+    sections = split_sections(text)
+    experience = sections.get("experience", [])
+    summary_lines = sections.get("summary", [])
+
+    return ResumeProfile(
+        summary=_clean(" ".join(summary_lines)),
+        titles=_dedupe([_clean(l) for l in experience if TITLE_WORDS.search(l) and not BULLET.match(l) and len(l) <= 100], MAX_TITLES),
+        years_experience=estimate_years(experience),
+        skills=extract_skills(sections.get("skills", [])) or skill_matcher.find_skills(text)[:MAX_SKILLS],
+        education=_dedupe([_clean(l) for l in sections.get("education", []) if DEGREE_WORDS.search(l)], MAX_EDUCATION),
+        certifications=_dedupe([_clean(l) for l in sections.get("certifications", [])], MAX_EDUCATION),
+        highlights=extract_highlights(experience + sections.get("projects", []) + sections.get("achievements", [])),
+        sections=[name for name in sections if name != "header"],
+        raw_text=text,
+    )
+
+
+def build_profile(document) -> ResumeProfile:
+    """Profile for an ``ingestion.Document``, parsed once per upload hash."""
+    profile = _profiles.get(document.sha256)
+    if profile is None:
+        profile = parse_profile(prompt_budget.clean_document(document))
+        _profiles.set(document.sha256, profile)
+    return profile
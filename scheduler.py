@@ -0,0 +1,225 @@
+"""Process-wide scheduler for LLM requests.
+
+Every completion passes through one ``Scheduler``. Its job is to keep the process within the
+account's per-minute limits rather than discovering them through 429s:
+
+- request and token budgets are token buckets refilled continuously (RPM and TPM);
+- each request reserves its estimated tokens (prompt + ``max_tokens``); unused tokens are refunded;
+- waiting requests are admitted strictly by priority, interactive page calls ahead of batch work
+  in the same process (question-bank refills, precompute threads);
+- 429s and transient server errors are retried with jittered exponential backoff, and a 429
+  pauses admission for everyone rather than letting the queue run into the same limit;
+  interactive requests stop retrying once a user would have waited too long;
+- the number of concurrent requests grows while latency stays near its best and shrinks
+  when latency climbs or the API throttles us.
+
+The budget is per process. CLI jobs (batch_match.py, regional_store.py) have their own, so when
+they run next to the app give them a share of the account's limits with ``OPENAI_RPM`` /
+``OPENAI_TPM`` and lower the app's to match.
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Optional
+
+import metrics
+from rate_limit import TokenBucket
+
+# --------------------------
+# Scheduler settings
+# --------------------------
+INTERACTIVE = 0  # a user is waiting on the page
+BATCH = 1  # CLI jobs, precompute and background refills
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+BURST_SECONDS = 10  # buckets hold this many seconds of quota, so a minute's budget isn't spent at once
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+INITIAL_CONCURRENCY = 8
+
+MAX_ATTEMPTS = 5
+BASE_BACKOFF = 0.5  # seconds; doubles per attempt, full jitter
+MAX_BACKOFF = 30.0
+THROTTLE_STATUS = 429
+# Total seconds a request may spend on failed attempts and backoff before giving up, per
+# priority (none for batch). A page shows an error rather than hanging through 5 read timeouts.
+RETRY_DEADLINE = {INTERACTIVE: 45.0}
+
+# Latency is compared per 1k reserved tokens so long answers don't read as congestion
+LATENCY_SMOOTHING = 0.2  # weight of the newest sample in the moving average
+BASELINE_DRIFT = 1.05  # the best-seen latency slowly relaxes so the baseline can follow real changes
+LATENCY_TOLERANCE = 2.0  # shrink once the average is this many times the baseline
+DECREASE_FACTOR = 0.9
+THROTTLE_FACTOR = 0.5
+
+_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority(level: int):
+    """Run the LLM calls made in this block (on this thread) at ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class Scheduler:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 max_concurrency: int = MAX_CONCURRENCY, max_attempts: int = MAX_ATTEMPTS):
+        self._requests = TokenBucket(requests_per_minute / 60, capacity=max(1, requests_per_minute * BURST_SECONDS / 60))
+        self._tokens = TokenBucket(tokens_per_minute / 60, capacity=max(1, tokens_per_minute * BURST_SECONDS / 60))
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._active = 0
+        self._limit = float(min(INITIAL_CONCURRENCY, max_concurrency))
+        self._paused_until = 0.0
+        self._latency = None
+        self._baseline = None
+        self._retries = 0
+        self._throttled = 0
+
+    # Admission
+    def _charge(self, cost: float) -> float:
+        """Tokens actually reserved for ``cost``: an oversized request waits for a full bucket."""
+        return min(cost, self._tokens.capacity)
+
+    def _admit(self, cost: float, level: int):
+        ticket = (level, next(self._sequence))
+        queued = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    wait = None
+                    if self._waiting[0] == ticket and self._active < int(self._limit):
+                        wait = max(self._paused_until - time.monotonic(),
+                                   self._requests.wait_time(1), self._tokens.wait_time(cost))
+                        if wait <= 0:
+                            self._requests.try_acquire(1)
+                            self._tokens.try_acquire(cost)
+                            heapq.heappop(self._waiting)
+                            self._active += 1
+                            self._cond.notify_all()
+                            break
+                    self._cond.wait(wait)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+        metrics.observe("llm_queue_seconds", time.monotonic() - queued, priority=PRIORITY_NAMES.get(level, str(level)))
+
+    def _release(self, cost: float, latency: Optional[float] = None, used: Optional[float] = None):
+        if used is not None and used < cost:
+            self._tokens.refund(cost - used)
+        with self._cond:
+            self._active -= 1
+            if latency is not None:
+                self._adapt(latency * 1000 / max(cost, 1))
+            self._cond.notify_all()
+
+    def _adapt(self, sample: float):
+        self._latency = sample if self._latency is None else (
+            LATENCY_SMOOTHING * sample + (1 - LATENCY_SMOOTHING) * self._latency)
+        self._baseline = sample if self._baseline is None else min(sample, self._baseline * BASELINE_DRIFT)
+        if self._latency > self._baseline * LATENCY_TOLERANCE:
+            self._limit = max(MIN_CONCURRENCY, self._limit * DECREASE_FACTOR)
+        else:
+            self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+
+    # Retries
+    def _backoff(self, error, attempt: int, retry_after, level: int, first_try: float) -> Optional[float]:
+        """Seconds to wait before retrying ``error``, or ``None`` if it shouldn't be retried."""
+        hint = retry_after(error) if retry_after else None
+        if hint is None or attempt + 1 >= self.max_attempts:
+            return None
+        delay = max(hint, random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)))
+        deadline = RETRY_DEADLINE.get(level)
+        if deadline is not None and time.monotonic() - first_try + delay > deadline:
+            return None
+        metrics.inc("llm_retries_total", status=str(getattr(error, "status_code", None) or type(error).__name__))
+        with self._cond:
+            self._retries += 1
+            if getattr(error, "status_code", None) == THROTTLE_STATUS:
+                # Everyone would hit the same limit: hold the queue and halve concurrency
+                self._throttled += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._limit = max(MIN_CONCURRENCY, self._limit * THROTTLE_FACTOR)
+        return delay
+
+    # Public API
+    def call(self, fn, cost: float, level: Optional[int] = None, retry_after=None, used=None):
+        """Run ``fn()`` once admitted, retrying transient failures.
+
+        ``retry_after(error)`` returns a minimum delay for errors worth retrying and ``None``
+        otherwise; ``used(result)`` reports the tokens actually consumed so the rest is refunded.
+        """
+        level = current_priority() if level is None else level
+        cost = self._charge(cost)
+        first_try = time.monotonic()
+        for attempt in range(self.max_attempts):
+            self._admit(cost, level)
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                self._release(cost)
+                delay = self._backoff(e, attempt, retry_after, level, first_try)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._release(cost, time.monotonic() - started, used(result) if used else None)
+            return result
+
+    def stream(self, start, cost: float, level: Optional[int] = None, retry_after=None, used=None):
+        """Yield from ``start()`` once admitted; the slot is held until the stream ends.
+
+        A failure before the first delta is retried like ``call``; after that it is raised,
+        since the consumer has already shown part of the reply. ``used()`` reports the tokens
+        a finished stream consumed (streams carry no usage, so the caller counts them).
+        """
+        level = current_priority() if level is None else level
+        cost = self._charge(cost)
+        first_try = time.monotonic()
+        for attempt in range(self.max_attempts):
+            self._admit(cost, level)
+            started = time.monotonic()
+            latency, emitted = None, False
+            try:
+                for delta in start():
+                    emitted = True
+                    yield delta
+                latency = time.monotonic() - started
+                return
+            except Exception as e:
+                delay = None if emitted else self._backoff(e, attempt, retry_after, level, first_try)
+                if delay is None:
+                    raise
+            finally:
+                self._release(cost, latency, used() if used and latency is not None else None)
+            time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "active": self._active,
+                "waiting": len(self._waiting),
+                "concurrency_limit": int(self._limit),
+                "latency_per_1k_tokens": self._latency,
+                "retries": self._retries,
+                "throttled": self._throttled,
+            }
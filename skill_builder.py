@@ -1,22 +1,13 @@
 import streamlit as st
-from openai import OpenAI
-import fitz  # PyMuPDF
-import json
-from streamlit_lottie import st_lottie
-
-# Load OpenAI API key from secrets
-client = OpenAI(api_key=st.secrets["openai_key"])
-
-# ---------- Resume PDF Text Extraction ----------
-def extract_text_from_pdf(uploaded_file):
-    text = ""
-    with fitz.open(stream=uploaded_file.read(), filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text()
-    return text.strip()
+import openai_api
+import ingestion
+import prompt_budget
+import resume_profile
+import assets
 
 # ---------- AI Resume Analysis ----------
-def analyze_resume_content(resume_text):
+def analyze_resume_content(resume_text, stream=False):
+    resume_text = prompt_budget.fit(resume_text, prompt_budget.RESUME_BUDGET, purpose="resume")
     prompt = f"""
 You are a career guidance expert.
 
@@ -25,24 +16,19 @@ Analyze the following resume and provide:
 2. Top 3 gaps or weaknesses
 3. A personalized learning roadmap with upskilling suggestions
 
-Resume:
+Resume (condensed profile):
 \"\"\"{resume_text}\"\"\"
 """
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = openai_api.chat(
         messages=[
             {"role": "system", "content": "You are a helpful and insightful AI career coach."},
             {"role": "user", "content": prompt}
         ],
         max_tokens=1000,
         temperature=0.7,
+        stream=stream,
     )
-    return response.choices[0].message.content
-
-# ---------- Optional: Load Lottie animation ----------
-def load_lottiefile(filepath: str):
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return response
 
 # ---------- UI Entry Point ----------
 def run():
@@ -68,11 +54,7 @@ Get started by uploading your resume below! ⬇️
 """)
 
     # Load and show Lottie animation
-    try:
-        lottie_resume = load_lottiefile("animations/Animation - 1749285315567.json")
-        st_lottie(lottie_resume, speed=1, loop=True, quality="high", height=250)
-    except Exception:
-        st.info("⚠️ Animation could not be loaded.")
+    assets.show_lottie("animations/Animation - 1749285315567.json", speed=1, loop=True, quality="high", height=250)
 
     # 📄 Upload Resume
     uploaded = st.file_uploader("📄 Upload Your Resume (PDF format)", type=["pdf"])
@@ -81,13 +63,14 @@ Get started by uploading your resume below! ⬇️
     if uploaded and st.button("🔍 Analyze Resume"):
         with st.spinner("Analyzing resume content..."):
             try:
-                resume_text = extract_text_from_pdf(uploaded)
-                if len(resume_text) < 100:
+                document = ingestion.ingest_upload(uploaded)
+                if len(document.text.strip()) < 100:
                     st.warning("⚠️ The resume text seems too short. Please upload a detailed resume.")
                     return
-                analysis = analyze_resume_content(resume_text)
+                # Compact profile parsed once per upload; shared with Resume Matcher
+                resume_text = resume_profile.build_profile(document).to_prompt()
                 st.markdown("### ✅ Career Analysis Result")
-                st.markdown(analysis)
+                st.write_stream(analyze_resume_content(resume_text, stream=True))
             except Exception as e:
                 st.error(f"❌ Error: {e}")
 
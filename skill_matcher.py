@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+# --------------------------
+# Bundled skill taxonomy
+# --------------------------
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills.json")
+SHORT_NAME_LENGTH = 2  # names this short ("C", "R", "Go") are ordinary words or letters in prose
+LIST_SEPARATOR = r"[,;/|()\[\]:\n\u2022\u00b7]"
+
+
+def normalize(text: str) -> str:
+    """Lower-case and flatten whitespace/dashes while keeping symbols used in skill names (+ # . /)."""
+    text = text.lower().replace("–", "-").replace("—", "-")
+    return re.sub(r"\s+", " ", text)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every occurrence of every pattern."""
+
+    def __init__(self, patterns: dict):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, payload in patterns.items():
+            self._add(pattern, payload)
+        self._build_links()
+
+    def _add(self, pattern, payload):
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((pattern, payload))
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str):
+        """Yield ``(start, end, pattern, payload)`` for every match (``end`` is exclusive)."""
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for pattern, payload in self._out[node]:
+                yield i + 1 - len(pattern), i + 1, pattern, payload
+
+
+def _list_item_pattern(name: str):
+    """``name`` spelled exactly, standing alone between list separators ("Python, Go and SQL")."""
+    before = rf"(?:^|{LIST_SEPARATOR}|\b(?:and|or)\b)"
+    after = rf"(?=$|{LIST_SEPARATOR}|\.(?:\s|$)|\s+(?:and|or)\b)"
+    return re.compile(rf"{before}[ \t]*({re.escape(name)})[ \t]*{after}", re.MULTILINE)
+
+
+class SkillTaxonomy:
+    def __init__(self, taxonomy: dict):
+        patterns, self._short = {}, []
+        for canonical, synonyms in taxonomy.items():
+            if len(canonical) <= SHORT_NAME_LENGTH:
+                # Too ambiguous for substring matching: only the exact spelling as a list item counts
+                self._short.append((canonical, _list_item_pattern(canonical)))
+                terms = synonyms
+            else:
+                terms = [canonical, *synonyms]
+            for term in terms:
+                patterns.setdefault(normalize(term), canonical)
+        self.skills = list(taxonomy)
+        self._matcher = AhoCorasick(patterns)
+
+    @classmethod
+    def from_json(cls, path=TAXONOMY_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def find(self, text: str) -> list:
+        """Canonical skills mentioned in ``text``, in order of first mention."""
+        original, text = text, normalize(text)
+        found = {}
+        for start, end, _, canonical in self._matcher.iter_matches(text):
+            # Whole words only: "java" must not match inside "javascript"
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            found.setdefault(canonical, start)
+        for canonical, pattern in self._short:
+            if canonical not in found:
+                match = pattern.search(original)
+                if match:
+                    found[canonical] = len(normalize(original[:match.start(1)]))
+        return sorted(found, key=found.get)
+
+
+@dataclass
+class SkillMatch:
+    score: int = None  # None when the job description names no known skills
+    matched: list = field(default_factory=list)
+    missing: list = field(default_factory=list)
+    extra: list = field(default_factory=list)
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy, compiled on first use."""
+    global _taxonomy
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                _taxonomy = SkillTaxonomy.from_json()
+    return _taxonomy
+
+
+def find_skills(text: str) -> list:
+    return get_taxonomy().find(text)
+
+
+def match_skills(resume_text: str, job_desc: str) -> SkillMatch:
+    """Deterministic resume/JD comparison: share of the JD's skills present in the resume."""
+    required = find_skills(job_desc)
+    present = find_skills(resume_text)
+    present_set, required_set = set(present), set(required)
+    matched = [s for s in required if s in present_set]
+    missing = [s for s in required if s not in present_set]
+    extra = [s for s in present if s not in required_set]
+    score = round(100 * len(matched) / len(required)) if required else None
+    return SkillMatch(score=score, matched=matched, missing=missing, extra=extra)
@@ -1,38 +1,29 @@
 import streamlit as st
-from streamlit_lottie import st_lottie
-import json
-import career_path_explorer
-import course_recommendations
-import global_insights
-import hackathon_internships
-import industry_trends
-import mock_interview
-import resume_matcher
-import skill_builder
-import streamlit.components.v1 as components
+import assets
+import importlib
+import metrics
 
 st.set_page_config(page_title="Career Coach", layout="wide")
+metrics.start()  # METRICS_PORT / METRICS_JSONL exporters; a no-op after the first run
 
-# Load Lottie animation
-def load_lottiefile(filepath: str):
-    with open(filepath, "r") as f:
-        return json.load(f)
-
-lottie_career = load_lottiefile("animations/Animation - 1748757720975.json")
-
-# Define app pages
+# Define app pages. Modules are imported the first time their page is opened, so the
+# Home page (and every rerun of it) doesn't pay for plotly, folium, fitz, fpdf, ...
 PAGES = {
     "🏠 Home": None,
-    "📄 Resume Matcher": resume_matcher,
-    "🌍 Global Insights": global_insights,
-    "📚 Course Recommendations": course_recommendations,
-    "📊 Career Path Explorer": career_path_explorer,
-    "🧠 Skill Builder": skill_builder,
-    "🧪 Mock Interview Prep": mock_interview,
-    "📅 Hackathons & Internships": hackathon_internships,
-    "💡 Industry Trends": industry_trends,
+    "📄 Resume Matcher": "resume_matcher",
+    "🌍 Global Insights": "global_insights",
+    "📚 Course Recommendations": "course_recommendations",
+    "📊 Career Path Explorer": "career_path_explorer",
+    "🧠 Skill Builder": "skill_builder",
+    "🧪 Mock Interview Prep": "mock_interview",
+    "📅 Hackathons & Internships": "hackathon_internships",
+    "💡 Industry Trends": "industry_trends",
 }
 
+def load_page(module_name: str):
+    # importlib caches in sys.modules: the import cost is paid once per process, not per rerun
+    return importlib.import_module(module_name)
+
 # Sidebar navigation
 st.sidebar.title("🧭 Navigate")
 selection = st.sidebar.radio("Go to", list(PAGES.keys()))
@@ -65,7 +56,7 @@ if selection == "🏠 Home":
         )
 
     with col2:
-        st_lottie(lottie_career, height=350, key="career")
+        assets.show_lottie("animations/Animation - 1748757720975.json", height=350, key="career")
 
     # 🔍 Module descriptions
     st.markdown("---")
@@ -97,7 +88,7 @@ Explore current industry trends, top companies, technologies in demand, and hiri
     """)
 
 else:
-    page = PAGES[selection]
+    page = load_page(PAGES[selection])
     if hasattr(page, "run") and callable(page.run):
         page.run()
     else: